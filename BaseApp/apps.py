@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BaseappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'BaseApp'
+
+    def ready(self):
+        from .partials import partial_registry
+        # compile the templates of every partial once, at startup
+        partial_registry.compile()
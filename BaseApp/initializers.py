@@ -0,0 +1,118 @@
+"""
+Per request registry of the JavaScript modules template tags initialize.
+
+Tags like init_content_toggles used to emit their own <script type="module">
+each, so a list of 300 cards shipped 600 scripts. With the registry they only
+record their IDs, and a single script calling initAll once per module is
+emitted by {% render_initializers %} at the end of the layout, or appended
+as an out of band swap to HTMX partial responses by InitializerMiddleware.
+The registry also remembers the modules used, so their whole import graph
+can be preloaded (see BaseApp.modules).
+"""
+import json
+
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .modules import module_url, preload_links
+
+INITIALIZERS_ELEMENT_ID = "page-initializers"
+
+
+class InitializerRegistry:
+    """
+    Collects the initAll arguments of each module while a response renders.
+    Modules are initialized in the order they were first registered.
+
+    Example usage:
+        registry.add_ids("ContentToggleHandler", "BaseApp/modules/ContentToggleHandler.mjs", ["basic"])
+        registry.add_configs("ActionInvoker", "BaseApp/modules/ActionInvoker.mjs", [{...}])
+        registry.render_script()  # one <script type="module">, empties the registry
+        registry.render_preloads()  # a modulepreload for every module needed
+    """
+
+    def __init__(self):
+        # export name -> [static path, ids or configs, takes configs]
+        self._modules = {}
+        # static paths of the modules to preload, in order of use
+        self._preloads = {}
+
+    def __bool__(self):
+        return bool(self._modules)
+
+    def has_preloads(self) -> bool:
+        return bool(self._preloads)
+
+    def add_preload(self, module_path: str):
+        """
+        Registers a module the page imports by itself, e.g. in the layout.
+        """
+        self._preloads.setdefault(module_path)
+
+    def add_ids(self, export_name: str, module_path: str, ids):
+        """
+        Registers element IDs for a module whose initAll takes space separated IDs.
+        """
+        entry = self._modules.setdefault(export_name, [module_path, [], False])
+        self.add_preload(module_path)
+        entry[1].extend(element_id for element_id in ids if element_id not in entry[1])
+
+    def add_configs(self, export_name: str, module_path: str, configs):
+        """
+        Registers config objects for a module whose initAll takes an array of configs.
+        """
+        entry = self._modules.setdefault(export_name, [module_path, [], True])
+        self.add_preload(module_path)
+        entry[1].extend(configs)
+
+    def render_script(self) -> str:
+        """
+        Returns one module script initializing everything registered so far,
+        or an empty string. The registry is emptied.
+        """
+        if not self._modules:
+            return ''
+        imports, calls = [], []
+        for export_name, (module_path, values, takes_configs) in self._modules.items():
+            imports.append(
+                f'import {{ {export_name} }} from "{module_url(module_path)}";')
+            argument = values if takes_configs else " ".join(values)
+            # escaped so no value can close the script tag
+            argument = json.dumps(argument).replace('<', '\\u003c')
+            calls.append(f'{export_name}.initAll({argument});')
+        self._modules = {}
+        lines = "\n    ".join(imports + calls)
+        return mark_safe(f'<script type="module">\n    {lines}\n</script>')
+
+    def render_preloads(self) -> str:
+        """
+        Returns the modulepreload links of the registered modules and their
+        imports, or an empty string. The preloads are emptied.
+        """
+        links = preload_links(list(self._preloads))
+        self._preloads = {}
+        return links
+
+    def render_element(self, oob: bool = False) -> str:
+        """
+        Returns the element holding the script, as an out of band swap for HTMX responses.
+        The layout's preloads go in the head (see InitializerMiddleware), an
+        out of band swap carries its own.
+        """
+        if oob:
+            return format_html('<div id="{}" hx-swap-oob="true">{}{}</div>', INITIALIZERS_ELEMENT_ID,
+                               self.render_preloads(), self.render_script())
+        return format_html('<div id="{}">{}</div>', INITIALIZERS_ELEMENT_ID, self.render_script())
+
+
+def get_initializer_registry(context):
+    """
+    Returns the registry of the template being rendered: the context's
+    'initializer_registry' if it has one (see BaseApp.partials), else
+    the request's, or None for templates rendered without either.
+    """
+    registry = context.get('initializer_registry')
+    if registry is not None:
+        return registry
+    request = context.get('request')
+    return getattr(request, 'initializer_registry', None)
@@ -0,0 +1,175 @@
+"""
+A single loguru sink routing the records of every module logger to its log file.
+
+get_module_logger used to add one file sink per call, each with a filter, so
+every record was checked against every sink and written, rotated and zipped
+on the request thread. The LogRouter is added to loguru once:
+    - records are routed with one dict lookup on their bound "name"
+    - registering the same module/file again is a no-op
+    - files are written by a background thread fed through a bounded queue,
+      logging only blocks when the writer falls maxsize records behind
+"""
+import atexit
+import os
+import queue
+import sys
+import threading
+import zipfile
+from datetime import datetime
+
+from loguru import logger
+
+from .constants import LOG_FORMAT
+
+LOG_QUEUE_SIZE = 10000
+LOG_ROTATION_BYTES = 10 * 1024 * 1024
+
+
+class LogFile:
+    """
+    An append-only log file, rotated and zipped once it reaches rotation_bytes.
+    Only used from the writer thread.
+    """
+
+    def __init__(self, path: str, rotation_bytes: int = LOG_ROTATION_BYTES):
+        self.path = path
+        self.rotation_bytes = rotation_bytes
+        self.reopen = False
+        self._file = None
+
+    def write(self, text: str):
+        if self.reopen:
+            self.reopen = False
+            self.close()
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        size = self._file.tell()
+        if size and size + len(text.encode("utf-8")) > self.rotation_bytes:
+            self.rotate()
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(text)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def rotate(self):
+        """
+        Moves the current file into a timestamped zip next to it.
+        """
+        self.close()
+        root, ext = os.path.splitext(self.path)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated_path = f"{root}.{timestamp}{ext}"
+        os.replace(self.path, rotated_path)
+        with zipfile.ZipFile(f"{rotated_path}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(rotated_path, os.path.basename(rotated_path))
+        os.remove(rotated_path)
+
+
+class LogRouter:
+    """
+    Sink of every module logger, see the module docstring.
+
+    Example usage:
+        log_router.register("views", "/app/BlogApp/logs/views.log")
+        logger.bind(name="views").info("written to views.log by the writer thread")
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE):
+        # module name -> the files its records are written to
+        self.routes = {}
+        self._files = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize)
+        self._handler_id = None
+        self._writer = None
+        self._writer_pid = None
+
+    def register(self, module_name: str, path: str):
+        """
+        Routes the records bound to module_name to the file at path.
+        The file is created right away, the sink is added on first use.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            paths = self.routes.setdefault(module_name, ())
+            if path not in paths:
+                self.routes[module_name] = paths + (path,)
+                self._files.setdefault(path, LogFile(path))
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, "a", encoding="utf-8").close()
+                # the writer may still hold a deleted file open
+                self._files[path].reopen = True
+            if self._handler_id is None:
+                self._handler_id = logger.add(
+                    self, format=LOG_FORMAT, level="DEBUG",
+                    filter=lambda record: record["extra"].get("name") in self.routes)
+
+    def write(self, message):
+        """
+        Called by loguru for every record, only enqueues the formatted message.
+        """
+        self._ensure_writer()
+        self._queue.put((message.record["extra"]["name"], str(message)))
+
+    def drain(self):
+        """
+        Blocks until every enqueued record is written and flushed.
+        """
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._queue.join()
+
+    def stop(self):
+        """
+        Called by loguru when the sink is removed (e.g. logger.remove()).
+        """
+        self.drain()
+        with self._lock:
+            self._handler_id = None
+
+    def _ensure_writer(self):
+        # a forked worker doesn't inherit the writer thread of its parent
+        if self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid != os.getpid():
+                self._queue = queue.Queue(self._queue.maxsize)
+                self._writer = threading.Thread(
+                    target=self._write_records, name="log-router", daemon=True)
+                self._writer_pid = os.getpid()
+                self._writer.start()
+
+    def _write_records(self):
+        while True:
+            name, text = self._queue.get()
+            try:
+                for path in self.routes.get(name, ()):
+                    self._files[path].write(text)
+                # flush once the burst is written, not after every record
+                if self._queue.qsize() == 0:
+                    for log_file in self._files.values():
+                        log_file.flush()
+            except Exception as e:  # the writer must survive, or logging blocks once the queue is full
+                sys.stderr.write(f"log-router failed to write {name} record: {e!r}\n")
+            finally:
+                self._queue.task_done()
+
+
+log_router = LogRouter()
+
+
+def flush_logs():
+    """
+    Waits until every log record so far is on disk, e.g. before reading a log file.
+    """
+    log_router.drain()
+
+
+atexit.register(flush_logs)
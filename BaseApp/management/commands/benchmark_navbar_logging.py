@@ -0,0 +1,48 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.template import Template, Context
+from django.test.utils import override_settings
+
+from BaseApp.menus import nav_registry
+from BaseApp.templatetags import menu_tags
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the cost of the navbar debug log on every page render'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000,
+                            help='Renders per measurement')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        template = Template("{% load menu_tags %}{% top_navbar_buttons %}")
+        module_logger = menu_tags.logger
+        navbar_items = nav_registry.items()
+
+        def render():
+            template.render(Context({}))
+
+        def eager_log():
+            # what top_navbar_buttons did before: format first, then drop the record
+            module_logger.debug(f"navbar_items: {navbar_items}")
+
+        def lazy_log():
+            module_logger.debug("navbar_items: {}", navbar_items)
+
+        def per_call(function):
+            return timeit.timeit(function, number=iterations) / iterations * 1e6
+
+        with override_settings(LOG_LEVELS={'menu_tags': 'INFO'}):
+            eager_us = per_call(eager_log)
+            lazy_us = per_call(lazy_log)
+            render_us = per_call(render)
+
+        self.stdout.write(f'{iterations} iterations, menu_tags at INFO level (DEBUG disabled):')
+        self.stdout.write(f'  eager f-string debug log: {eager_us:8.2f} us')
+        self.stdout.write(f'  lazy debug log:           {lazy_us:8.2f} us')
+        self.stdout.write(f'  navbar render:            {render_us:8.2f} us')
+        self.stdout.write(self.style.SUCCESS(
+            f'Saving per navbar render: {eager_us - lazy_us:.2f} us '
+            f'({(eager_us - lazy_us) / (render_us + eager_us - lazy_us):.0%} of the render)'))
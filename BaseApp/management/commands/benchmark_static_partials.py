@@ -0,0 +1,49 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.template import loader
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from BaseApp.partials import partial_registry, partial_view
+
+
+class Command(BaseCommand):
+    help = 'Compares requests per second of static partials rendered per request, from memory and as 304s'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Requests per measurement')
+
+    def handle(self, *args, **options):
+        number = options['requests']
+        factory = RequestFactory(headers={'HX-Request': 'true'})
+        names = ['django-info', 'toggled-content-examples', 'buttons-examples']
+
+        def rps(view, request, name):
+            return number / timeit.timeit(lambda: view(request, name), number=number)
+
+        with override_settings(DEBUG=False):
+            for name in names:
+                request = factory.get('/')
+                request.htmx = True
+                partial = partial_registry.get(name)
+
+                def render_per_request(request, name, partial=partial):
+                    # what the views did before: load and render on every request
+                    template = loader.get_template(partial.template_name)
+                    return HttpResponse(template.render(partial.context, request))
+
+                before = rps(render_per_request, request, name)
+                from_memory = rps(partial_view, request, name)
+                etag = partial.render_static()[1]
+                revalidation = factory.get('/', headers={'If-None-Match': f'"{etag}"'})
+                revalidation.htmx = True
+                not_modified = rps(partial_view, revalidation, name)
+
+                self.stdout.write(
+                    f'{name:>26}: rendered {before:9.0f} rps | '
+                    f'from memory {from_memory:9.0f} rps | 304 {not_modified:9.0f} rps')
+        self.stdout.write(self.style.SUCCESS(
+            'View level throughput, middleware and network excluded'))
@@ -0,0 +1,44 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BUNDLE_NAME = 'BaseApp/bundle.mjs'
+
+
+class Command(BaseCommand):
+    help = 'Bundles the BaseApp ES modules into one file with esbuild (optional, see settings.MODULE_BUNDLE)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--esbuild', default=None,
+                            help='Path of the esbuild executable, found in node_modules or on PATH by default')
+        parser.add_argument('--no-minify', action='store_true',
+                            help='Keep the bundle readable')
+
+    def handle(self, *args, **options):
+        static_dir = Path(apps.get_app_config('BaseApp').path) / 'static'
+        modules_dir = static_dir / 'BaseApp' / 'modules'
+        output = static_dir / BUNDLE_NAME
+        esbuild = options['esbuild'] or (
+            shutil.which('esbuild', path=Path(settings.BASE_DIR) / 'node_modules' / '.bin')
+            or shutil.which('esbuild'))
+        if not esbuild:
+            raise CommandError('esbuild was not found, install it with: npm install --save-dev esbuild')
+
+        # one entry point re-exporting every module, imports are resolved from the modules directory
+        modules = sorted(modules_dir.glob('*.mjs'))
+        entry = ''.join(f'export * from "./{module.name}";\n' for module in modules)
+        command = [esbuild, '--bundle', '--format=esm', f'--outfile={output}', '--log-level=warning']
+        if not options['no_minify']:
+            command.append('--minify')
+        try:
+            subprocess.run(command, input=entry, text=True, cwd=modules_dir, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise CommandError(f'esbuild failed: {e}') from e
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Bundled {len(modules)} modules into {output}. Set MODULE_BUNDLE = '{BUNDLE_NAME}' "
+            f"and run collectstatic to serve it under a hashed name."))
@@ -1,3 +1,7 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import render_to_string
 from django.urls import reverse
 
 
@@ -17,17 +21,76 @@ class DropdownNavItem:
         return self.__str__()
 
 
-navbar_items = {
-    "Documentation": [
-        DropdownNavItem("Blog", reverse('BlogApp:blog')),
-        DropdownNavItem("Home", reverse('BaseApp:home')),
-        DropdownNavItem("Home", reverse('BaseApp:home')),
-    ],
-    "Components": [
-        DropdownNavItem("User Interface", reverse('BaseApp:ui-elements')),
-        DropdownNavItem("Home", reverse('BaseApp:home')),
-    ],
-    "Tools": [
-        DropdownNavItem("Flash Cards", reverse('FlashCardApp:base')),
-    ],
-}
+class NavRegistry:
+    """
+    Registry of the top navbar's dropdown buttons.
+    Items are registered with URL names, which are only reversed the first
+    time the navbar is needed (once the URLconf is loaded), then kept.
+    The rendered navbar never changes between deploys, so its HTML is kept
+    per process and per active section. Like Django's cached template loader,
+    nothing is kept with DEBUG on so template edits show up right away.
+
+    Example usage:
+        nav_registry.register("Tools", "Flash Cards", 'FlashCardApp:base')
+        nav_registry.render()  # the nav_dropdown_buttons.html of every button
+    """
+    template_name = 'BaseApp/navigation/nav_dropdown_buttons.html'
+
+    def __init__(self):
+        # button name -> [(item name, url name)]
+        self._entries = {}
+        self._items = None
+        self._rendered = {}
+
+    def register(self, button_name: str, name: str, url_name: str):
+        self._entries.setdefault(button_name, []).append((name, url_name))
+        self.clear()
+
+    def clear(self):
+        """
+        Forgets the resolved URLs and the rendered navbars.
+        """
+        self._items = None
+        self._rendered = {}
+
+    def items(self) -> dict:
+        """
+        Returns the DropdownNavItems of each button, reversing the URLs once.
+        """
+        if self._items is None:
+            self._items = {
+                button_name: [DropdownNavItem(name, reverse(url_name))
+                              for name, url_name in entries]
+                for button_name, entries in self._entries.items()
+            }
+        return self._items
+
+    def render(self, active_section: str = None) -> str:
+        """
+        Returns the rendered navbar buttons, a dict lookup after the first render.
+        """
+        html = self._rendered.get(active_section)
+        if html is None:
+            html = render_to_string(self.template_name, {
+                'navbar_items': self.items(),
+                'active_section': active_section,
+            })
+            if not settings.DEBUG:
+                self._rendered[active_section] = html
+        return html
+
+
+nav_registry = NavRegistry()
+
+nav_registry.register("Documentation", "Blog", 'BlogApp:blog')
+nav_registry.register("Documentation", "Home", 'BaseApp:home')
+nav_registry.register("Documentation", "Home", 'BaseApp:home')
+nav_registry.register("Components", "User Interface", 'BaseApp:ui-elements')
+nav_registry.register("Components", "Home", 'BaseApp:home')
+nav_registry.register("Tools", "Flash Cards", 'FlashCardApp:base')
+
+
+@receiver(setting_changed)
+def clear_nav_registry(setting, **kwargs):
+    if setting in ('ROOT_URLCONF', 'TEMPLATES', 'DEBUG'):
+        nav_registry.clear()
@@ -0,0 +1,235 @@
+import json
+import mimetypes
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .initializers import InitializerRegistry
+from .storage import ENCODING_SUFFIXES
+from .timing import RequestTimings, activate_timings, current_timings, deactivate_timings
+from .utils import Lazy, get_module_logger
+
+module_logger = get_module_logger("middleware", __file__)
+
+
+class RequestTimingMiddleware:
+    """
+    Measures where the time of a sampled request goes: total and view time,
+    query time and count (through a connection execute wrapper), template
+    render time and cache hits/misses (see BaseApp.timing).
+    The breakdown is sent as a Server-Timing header and logged as JSON.
+
+    settings.REQUEST_TIMING_SAMPLE_RATE is the fraction of requests sampled,
+    0 turns it off. Requests that aren't sampled only cost a random().
+    Put it first in MIDDLEWARE so the total covers every other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, 'REQUEST_TIMING_SAMPLE_RATE', 0)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = activate_timings(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.query_wrapper))
+                response = self.get_response(request)
+        finally:
+            deactivate_timings(token)
+        timings.finish()
+
+        response['Server-Timing'] = timings.server_timing()
+        module_logger.info("request timing {}", Lazy(lambda: json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timings.as_dict(),
+        })))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings()
+        if timings is not None:
+            timings.view_started = timings.view_started or time.perf_counter()
+        return None
+
+
+class InitializerMiddleware:
+    """
+    Gives every request an InitializerRegistry (see BaseApp.initializers).
+    Initializers still pending once the response is rendered, e.g. those of
+    HTMX partials that don't extend the layout, are added to the response:
+    as an out of band swap of the layout's initializer element for HTMX
+    requests, as a plain script before the </body> otherwise.
+    The modulepreload links of the modules used go at the end of the <head>
+    of full pages, so the browser fetches them before reaching the scripts.
+    Must come after django_htmx's HtmxMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.initializer_registry = registry = InitializerRegistry()
+        response = self.get_response(request)
+        if ((registry or registry.has_preloads()) and not response.streaming
+                and response.get('Content-Type', '').startswith('text/html')):
+            if getattr(request, 'htmx', False):
+                response.content += registry.render_element(oob=True).encode()
+            else:
+                response.content = self.insert_into_page(
+                    response.content, registry.render_preloads().encode(),
+                    registry.render_script().encode(), request.path)
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = str(len(response.content))
+        return response
+
+    @staticmethod
+    def insert_into_page(content: bytes, preloads: bytes, script: bytes, path: str) -> bytes:
+        """
+        Puts the preloads at the end of the <head> and the script at the end of
+        the <body>, or of the <html> without a body. Pages with neither are
+        fragments, the script is appended to them with a warning.
+        """
+        head = content.find(b'</head>')
+        if head != -1:
+            content = content[:head] + preloads + content[head:]
+            preloads = b''
+        for closing_tag in (b'</body>', b'</html>'):
+            index = content.rfind(closing_tag)
+            if index != -1:
+                return content[:index] + preloads + script + content[index:]
+        module_logger.warning("no </body> or </html> in the page of {}, appending its initializers", path)
+        return content + preloads + script
+
+
+# seconds browsers may keep a hashed static file, which never changes
+STATIC_HASHED_MAX_AGE = 60 * 60 * 24 * 365
+# seconds browsers may keep a static file requested by its unhashed name
+STATIC_MAX_AGE = 60
+# larger files are streamed from disk (with sendfile where the server has it)
+STATIC_MEMORY_MAX_SIZE = 512 * 1024
+STATIC_CONTENT_TYPES = {'.mjs': 'text/javascript'}
+
+
+def accepted_encodings(header: str) -> set:
+    """
+    Returns the content codings an Accept-Encoding header allows.
+    Codings with a q value of 0 (0.0, 0.000...) or an invalid one are refused.
+    """
+    accepted = set()
+    for value in header.split(','):
+        coding, *params = value.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, param_value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Serves files collected into STATIC_ROOT before any other middleware runs.
+    Picks the .br or .gz variant written by CompressedManifestStaticFilesStorage
+    that the client accepts, keeps small files in memory and streams the rest.
+    Hashed names (those in the staticfiles manifest) are cached for a year
+    as immutable, other names for STATIC_MAX_AGE.
+    With DEBUG on, or without STATIC_ROOT, requests are passed on, so
+    runserver keeps serving the app directories as usual.
+    Put it first in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # url path -> (content type, {encoding: (file path, content or None)})
+        self._files = {}
+        self._hashed_names = None
+
+    def __call__(self, request):
+        if (settings.DEBUG or not settings.STATIC_ROOT
+                or request.method not in ('GET', 'HEAD')
+                or not request.path_info.startswith(settings.STATIC_URL)):
+            return self.get_response(request)
+        name = request.path_info[len(settings.STATIC_URL):]
+        static_file = self.find(name)
+        if static_file is None:
+            return self.get_response(request)
+        return self.serve(request, name, *static_file)
+
+    def hashed_names(self) -> set:
+        if self._hashed_names is None:
+            # empty unless the storage has a manifest
+            self._hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self._hashed_names
+
+    def find(self, name: str):
+        """
+        Returns the content type and variants of a collected file, or None.
+        """
+        static_file = self._files.get(name)
+        if static_file is None:
+            root = os.path.realpath(settings.STATIC_ROOT)
+            path = os.path.realpath(os.path.join(root, name))
+            if (not path.startswith(root + os.sep) or not os.path.isfile(path)
+                    or path.endswith(tuple(ENCODING_SUFFIXES.values()))):
+                return None
+            extension = os.path.splitext(path)[1]
+            content_type = (STATIC_CONTENT_TYPES.get(extension)
+                            or mimetypes.guess_type(path)[0] or 'application/octet-stream')
+            variants = {None: path}
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                if os.path.isfile(path + suffix):
+                    variants[encoding] = path + suffix
+            static_file = (content_type, {
+                encoding: (variant, self.read(variant)) for encoding, variant in variants.items()
+            })
+            self._files[name] = static_file
+        return static_file
+
+    @staticmethod
+    def read(path: str):
+        if os.path.getsize(path) > STATIC_MEMORY_MAX_SIZE:
+            return None
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def serve(self, request, name, content_type, variants):
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding = next((encoding for encoding in ENCODING_SUFFIXES
+                         if encoding in variants and encoding in accepted), None)
+        path, content = variants[encoding]
+        if content is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Length'] = str(len(content))
+        if encoding:
+            response['Content-Encoding'] = encoding
+        elif 'Content-Encoding' in response:  # FileResponse guesses it from the name
+            del response['Content-Encoding']
+        if len(variants) > 1:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        if name in self.hashed_names():
+            response['Cache-Control'] = f'public, max-age={STATIC_HASHED_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+        return response
+
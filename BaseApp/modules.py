@@ -0,0 +1,98 @@
+"""
+The ES modules under the static directories and how pages load them.
+
+Browsers only discover a module's imports once the module has arrived, so
+ActionInvoker.mjs -> strategies.mjs -> LoggingUtils.mjs are fetched one
+after the other. preload_links() lists the whole import graph of the
+modules a page uses as <link rel="modulepreload">, so they are fetched in
+parallel. With settings.MODULE_BUNDLE set (see the bundle_modules command)
+every module is imported from that single bundle instead.
+"""
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+# the relative specifiers of static imports and re-exports
+IMPORT_PATTERN = re.compile(
+    r"""^\s*(?:import|export)\b[^'";]*?['"](?P<url>\.{1,2}/[^'"]+)['"]""", re.MULTILINE)
+
+
+class ModuleGraph:
+    """
+    Static imports of each module, read from its source the first time.
+    Like the other per process caches nothing is kept with DEBUG on.
+
+    Example usage:
+        module_graph.closure(["BaseApp/modules/ActionInvoker.mjs"])
+        # ['BaseApp/modules/ActionInvoker.mjs', 'BaseApp/modules/LoggingUtils.mjs', ...]
+    """
+
+    def __init__(self):
+        self._imports = {}
+
+    def clear(self):
+        self._imports = {}
+
+    def imports(self, module_path: str) -> list:
+        """
+        Returns the static paths a module imports, [] if it can't be found.
+        """
+        imports = self._imports.get(module_path)
+        if imports is None:
+            source_path = finders.find(module_path)
+            if source_path is None:
+                return []
+            with open(source_path, encoding='utf-8') as source:
+                urls = IMPORT_PATTERN.findall(source.read())
+            directory = posixpath.dirname(module_path)
+            imports = [posixpath.normpath(posixpath.join(directory, url)) for url in urls]
+            if not settings.DEBUG:
+                self._imports[module_path] = imports
+        return imports
+
+    def closure(self, module_paths) -> list:
+        """
+        Returns the modules and everything they import, each once.
+        """
+        seen = {}
+        pending = list(module_paths)
+        while pending:
+            module_path = pending.pop(0)
+            if module_path not in seen:
+                seen[module_path] = None
+                pending.extend(self.imports(module_path))
+        return list(seen)
+
+
+module_graph = ModuleGraph()
+
+
+def module_url(module_path: str) -> str:
+    """
+    Returns the URL to import a module from, the bundle's if there is one.
+    """
+    return static(getattr(settings, 'MODULE_BUNDLE', None) or module_path)
+
+
+def preload_links(module_paths) -> str:
+    """
+    Returns a <link rel="modulepreload"> for every module the given ones need.
+    """
+    if not module_paths:
+        return ''
+    bundle = getattr(settings, 'MODULE_BUNDLE', None)
+    paths = [bundle] if bundle else module_graph.closure(module_paths)
+    return format_html_join('', '<link rel="modulepreload" href="{}">',
+                            ((static(path),) for path in paths))
+
+
+@receiver(setting_changed)
+def clear_module_graph(setting, **kwargs):
+    if setting in ('STATICFILES_DIRS', 'STATICFILES_FINDERS', 'DEBUG'):
+        module_graph.clear()
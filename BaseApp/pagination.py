@@ -0,0 +1,132 @@
+"""
+Keyset (cursor) pagination.
+
+Unlike django.core.paginator.Paginator, a keyset page never runs a COUNT(*)
+and never uses OFFSET: the next page is selected with a range filter on
+the ordering columns, so deep pages cost the same as the first one as long
+as an index covers the ordering.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a cursor can't be decoded or doesn't fit the paginator.
+    """
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encodes a list of JSON serializable values into an opaque, url safe cursor.
+    """
+    payload = json.dumps(values, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decodes a cursor made by encode_cursor.
+    Raises InvalidCursorError if the cursor was tampered with.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+    return values
+
+
+class KeysetPage:
+    """
+    A single page of a KeysetPaginator.
+        - object_list: The objects on this page.
+        - has_next: Whether there is a page after this one.
+        - next_cursor: The cursor of the next page, None on the last page.
+    """
+
+    def __init__(self, object_list: list, has_next: bool, next_cursor: str = None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self)} objects, has_next={self.has_next}>"
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset on a unique ordering, e.g. ('-created_at', '-id').
+    The last field of the ordering must be unique so pages never overlap.
+
+    Example usage:
+        paginator = KeysetPaginator(BlogPost.objects.all(), ('-created_at', '-id'), 8)
+        page = paginator.get_page(request.POST.get('cursor'))
+        page.next_cursor  # pass this back to get the following page
+    """
+
+    def __init__(self, queryset, ordering: tuple, page_size: int):
+        if not ordering:
+            raise ValueError("KeysetPaginator requires at least one ordering field.")
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        # (field name, descending) pairs
+        self.keys = [(field.lstrip('-'), field.startswith('-'))
+                     for field in self.ordering]
+
+    def get_page(self, cursor: str = None) -> KeysetPage:
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self._after(decode_cursor(cursor)))
+        # one extra row tells us if there is a next page without counting
+        rows = list(queryset[:self.page_size + 1])
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        next_cursor = self.cursor_for(rows[-1]) if has_next else None
+        return KeysetPage(rows, has_next, next_cursor)
+
+    def cursor_for(self, obj) -> str:
+        """
+        Returns the cursor of the page that starts right after the given object.
+        """
+        values = []
+        for name, _ in self.keys:
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return encode_cursor(values)
+
+    def _after(self, values: list):
+        """
+        Builds the filter selecting rows that come after the given key values,
+        i.e. (a, b) > (va, vb) expanded to a > va OR (a = va AND b > vb).
+        """
+        if len(values) != len(self.keys):
+            raise InvalidCursorError("Cursor does not match the paginator ordering.")
+        model = self.queryset.model
+        try:
+            values = [model._meta.get_field(name).to_python(value)
+                      for (name, _), value in zip(self.keys, values)]
+        except (ValidationError, TypeError, ValueError) as e:
+            # e.g. a list or dict decoded from a forged cursor
+            raise InvalidCursorError("Cursor values do not match the ordering fields.") from e
+        condition = Q()
+        for position, (name, descending) in enumerate(self.keys):
+            lookup = 'lt' if descending else 'gt'
+            step = Q(**{f"{name}__{lookup}": values[position]})
+            for previous_position in range(position):
+                previous_name = self.keys[previous_position][0]
+                step &= Q(**{previous_name: values[previous_position]})
+            condition |= step
+        return condition
@@ -0,0 +1,189 @@
+"""
+Registry of the HTMX partials served by the generic partial view.
+
+A partial is a name bound to a template, a context provider and a cache
+policy. One URL pattern (BaseApp:partial) and one view serve them all,
+so adding a UI example only takes a register() call:
+
+    partial_registry.register('content-toggle-basic',
+                              'BaseApp/ui_elements/partials/content_toggle/basic.html')
+    {% url 'BaseApp:partial' 'content-toggle-basic' %}
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
+from django.template import loader
+from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+)
+
+from .cache import CacheStats
+from .initializers import InitializerRegistry
+from .timing import record_cache
+
+# seconds clients may reuse a static partial before revalidating its ETag
+STATIC_PARTIAL_MAX_AGE = 60 * 5
+
+# cache policies
+STATIC = 'static'  # rendered once per process, served from memory with an ETag
+NO_CACHE = None  # rendered for every request
+
+
+class Partial:
+    """
+    A registered partial.
+        - name: The name in the partial URL.
+        - template_name: The template to render.
+        - context: A dict, or a callable taking the request and returning one.
+        - cache: STATIC or NO_CACHE. Static partials are rendered without a
+          request from a constant context, so they must not hold anything
+          request or user specific: forms rely on the CSRF header the layout
+          adds to every HTMX request instead of {% csrf_token %}.
+        - max_age: Seconds clients may reuse a static partial.
+        - htmx_only: Redirect other requests home, like require_htmx.
+    The scripts of init tags in a static partial are collected into one
+    script at the end of its body, after the modulepreloads of their
+    modules. With DEBUG on nothing is kept, so template edits show up
+    right away.
+    """
+
+    def __init__(self, name: str, template_name: str, context=None, cache=STATIC,
+                 max_age: int = STATIC_PARTIAL_MAX_AGE, htmx_only: bool = True):
+        if cache == STATIC and callable(context):
+            raise ValueError(f"Static partial '{name}' needs a constant context.")
+        self.name = name
+        self.template_name = template_name
+        self.context = context or {}
+        self.cache = cache
+        self.max_age = max_age
+        self.htmx_only = htmx_only
+        self.stats = CacheStats(f"partial:{name}")
+        self._template = None
+        self._rendered = None
+
+    def compile(self):
+        """
+        Loads the template once, it is reloaded on every render with DEBUG on.
+        """
+        self._template = loader.get_template(self.template_name)
+
+    def get_template(self):
+        if self._template is None or settings.DEBUG:
+            self.compile()
+        return self._template
+
+    def render_static(self) -> tuple:
+        """
+        Returns the (body, etag) of a static partial, rendered on first use.
+        """
+        if self._rendered is not None:
+            return self._rendered
+        registry = InitializerRegistry()
+        body = self.get_template().render(
+            {**self.context, 'initializer_registry': registry})
+        body += registry.render_preloads() + registry.render_script()
+        rendered = (body, hashlib.sha256(body.encode()).hexdigest())
+        if not settings.DEBUG:
+            self._rendered = rendered
+        return rendered
+
+    def respond(self, request) -> HttpResponse:
+        started = time.perf_counter()
+        was_rendered = self._rendered is not None
+        if self.cache == STATIC:
+            body, etag = self.render_static()
+            etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = HttpResponse(body)
+            response['ETag'] = etag
+            patch_cache_control(response, public=True, max_age=self.max_age)
+        else:
+            context = self.context(request) if callable(self.context) else self.context
+            response = HttpResponse(self.get_template().render(context, request))
+        patch_vary_headers(response, ['HX-Request'])
+
+        if was_rendered:
+            self.stats.record(1, 0)
+            record_cache(1, 0)
+        else:
+            self.stats.record(0, 1, time.perf_counter() - started)
+            record_cache(0, 1)
+        return response
+
+
+class PartialRegistry:
+    """
+    Partials by name, see Partial for the options of register().
+    """
+
+    def __init__(self):
+        self._partials = {}
+
+    def register(self, name: str, template_name: str, **options) -> Partial:
+        partial = Partial(name, template_name, **options)
+        self._partials[name] = partial
+        return partial
+
+    def get(self, name: str) -> Partial:
+        try:
+            return self._partials[name]
+        except KeyError:
+            raise Http404(f"No partial named '{name}'.") from None
+
+    def __iter__(self):
+        return iter(self._partials.values())
+
+    def compile(self):
+        """
+        Loads every template, called once at startup (see BaseappConfig.ready).
+        """
+        for partial in self:
+            partial.compile()
+
+    def stats(self) -> list:
+        """
+        Returns the cache stats snapshot of every partial.
+        """
+        return [partial.stats.snapshot() for partial in self]
+
+
+partial_registry = PartialRegistry()
+
+
+def partial_view(request, name):
+    """
+    Serves the registered partial with the given name.
+    """
+    partial = partial_registry.get(name)
+    if partial.htmx_only and not request.htmx:
+        return redirect(reverse("BaseApp:home"))
+    return partial.respond(request)
+
+
+# HOME
+partial_registry.register('django-info', 'BaseApp/home/partials/django_info.html',
+                          context={'django_version': "???"})
+partial_registry.register('tailwind-info', 'BaseApp/home/partials/tailwind_partial.html',
+                          context={'tailwind_version': "?"})
+partial_registry.register('htmx-info', 'BaseApp/home/partials/htmx_info.html',
+                          context={'htmx_version': "??"})
+# UI ELEMENTS
+partial_registry.register('buttons-examples',
+                          'BaseApp/ui_elements/sections/buttons_examples.html')
+partial_registry.register('toggled-content-examples',
+                          'BaseApp/ui_elements/sections/toggled_content_examples.html')
+partial_registry.register('button-example-minimal',
+                          'BaseApp/ui_elements/partials/buttons/button_example_minimal.html')
+partial_registry.register('content-toggle-basic',
+                          'BaseApp/ui_elements/partials/content_toggle/basic.html')
+partial_registry.register('content-toggle-multi-toggle-panel',
+                          'BaseApp/ui_elements/partials/content_toggle/multi_toggle_panel.html')
+partial_registry.register('content-toggle-forloop-accordian',
+                          'BaseApp/ui_elements/partials/content_toggle/forloop_accordian.html')
+partial_registry.register('content-toggle-hover-dropdown',
+                          'BaseApp/ui_elements/partials/content_toggle/hover_dropdown.html')
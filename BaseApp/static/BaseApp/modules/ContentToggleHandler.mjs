@@ -42,7 +42,7 @@ const logger = setup_logger(MODULE_NAME, DEBUG);
  * </div>
  *
  * Example JavaScript:
- * import { ContentToggleHandler } from "./ContentToggleHandler.mjs";
+ * import { ContentToggleHandler } from "{% static 'BaseApp/modules/ContentToggleHandler.mjs' %}";
  * ContentToggleHandler.initAll('my-toggle');
  */
 
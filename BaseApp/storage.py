@@ -0,0 +1,97 @@
+"""
+Production static files: hashed names and precompressed variants.
+
+collectstatic with CompressedManifestStaticFilesStorage writes every file
+under its content hashed name (htmx.min.js -> htmx.min.0f3a9c1e22b4.js),
+rewrites the imports between ES modules to the hashed names, and writes a
+.gz and a .br file next to each compressible file. StaticFilesMiddleware
+serves them with far-future immutable caching.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+from .utils import Lazy, get_module_logger
+
+module_logger = get_module_logger("storage", __file__)
+
+# extensions worth compressing, images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = ('.css', '.html', '.js', '.json', '.map', '.mjs', '.svg', '.txt', '.xml')
+# smaller files don't gain enough to make up for the extra file
+MIN_COMPRESS_SIZE = 256
+# encoding -> file suffix, in order of preference
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+# (regex, replacement) pairs rewriting relative ES module imports and re-exports to hashed names
+MODULE_IMPORT_PATTERNS = (
+    (
+        r"""(?P<matched>import(?s:(?P<import>[\s\{].*?))\s*from\s*['"](?P<url>[./].*?)["']\s*;)""",
+        'import%(import)s from "%(url)s";',
+    ),
+    (
+        r"""(?P<matched>export(?s:(?P<exports>[\s\{].*?))\s*from\s*["'](?P<url>[./].*?)["']\s*;)""",
+        'export%(exports)s from "%(url)s";',
+    ),
+    (
+        r"""(?P<matched>import\s*['"](?P<url>[./].*?)["']\s*;)""",
+        'import"%(url)s";',
+    ),
+    (
+        r"""(?P<matched>import\(["'](?P<url>.*?)["']\))""",
+        'import("%(url)s")',
+    ),
+)
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, quality=11)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> list:
+    return [encoding for encoding in ENCODING_SUFFIXES
+            if encoding != 'br' or brotli is not None]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also rewrites the imports of .mjs modules
+    and precompresses its output with gzip and brotli (when installed).
+    A variant is only kept when it is at least 5% smaller than the file.
+    """
+    support_js_module_import_aggregation = True
+    # the import patterns of Django's storage only apply to *.js
+    patterns = ManifestStaticFilesStorage.patterns + (('*.mjs', MODULE_IMPORT_PATTERNS),)
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = set()
+        for name, hashed_name, result in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, result
+            if not dry_run and isinstance(result, bool) and hashed_name:
+                processed.update((name, hashed_name))
+        for name in sorted(processed):
+            self.compress_file(name)
+
+    def compress_file(self, name: str):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for encoding in available_encodings():
+            compressed = compress(content, encoding)
+            variant_name = name + ENCODING_SUFFIXES[encoding]
+            if self.exists(variant_name):
+                self.delete(variant_name)
+            if len(compressed) < len(content) * 0.95:
+                self._save(variant_name, ContentFile(compressed))
+                module_logger.debug("{} {} -> {} bytes", Lazy(lambda: os.path.basename(variant_name)),
+                                    len(content), len(compressed))
@@ -1,7 +1,8 @@
 from django import template
-from django.templatetags.static import static
 from django.utils.safestring import mark_safe
 from BaseApp.exceptions import TemplateTagInitError
+from BaseApp.initializers import get_initializer_registry
+from BaseApp.modules import module_url
 from BaseApp.utils import get_module_logger
 
 module_logger = get_module_logger("templatetags", __file__)
@@ -16,8 +17,8 @@ VALID_STRATEGIES = [
 ]
 
 
-@register.simple_tag
-def invoke_action(event, action, strategy, target_id):
+@register.simple_tag(takes_context=True)
+def invoke_action(context, event, action, strategy, target_id):
     """
     Generates the JavaScript code to initialize ActionInvoker instances.
 
@@ -28,7 +29,8 @@ def invoke_action(event, action, strategy, target_id):
         target_id: The ID of the element to attach the event listener to.
 
     Returns:
-        Safe JavaScript code string.
+        Safe JavaScript code string, or nothing when the request's
+        InitializerRegistry collects the config for {% render_initializers %}.
 
     Raises:
         TemplateTagInitError: If validation fails.
@@ -38,7 +40,8 @@ def invoke_action(event, action, strategy, target_id):
         {% invoke_action "on-load" "click" "all" "my-button-group" %}
     """
     module_logger.debug(
-        f"invoke_action tag generated JavaScript code: event: {event}, action: {action}, strategy: {strategy}, target_id: {target_id}")
+        "invoke_action tag generated JavaScript code: event: {}, action: {}, strategy: {}, target_id: {}",
+        event, action, strategy, target_id)
 
     # TODO: Add further validation for the `event`, `action`, and `strategy` parameters as needed
     # TODO: Ensure that the `target_id` exists in the document before proceeding
@@ -82,7 +85,14 @@ def invoke_action(event, action, strategy, target_id):
         module_logger.error(f"Validation error: {e}")
         raise TemplateTagInitError(str(e))
 
-    module_path = static("BaseApp/modules/ActionInvoker.mjs")
+    registry = get_initializer_registry(context)
+    if registry is not None:
+        registry.add_configs("ActionInvoker", "BaseApp/modules/ActionInvoker.mjs", [{
+            'event': event, 'action': action, 'targetId': target_id, 'strategy': strategy,
+        }])
+        return ''
+
+    module_path = module_url("BaseApp/modules/ActionInvoker.mjs")
 
     # Generate the JavaScript code
     js_code = f"""
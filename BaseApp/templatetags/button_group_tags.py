@@ -1,10 +1,11 @@
 import re
 
 from django import template
-from django.templatetags.static import static
 from django.utils.safestring import mark_safe
 
 from BaseApp.exceptions import TemplateTagInitError
+from BaseApp.initializers import get_initializer_registry
+from BaseApp.modules import module_url
 from BaseApp.utils import get_module_logger
 
 module_logger = get_module_logger("templatetags", __file__)
@@ -21,7 +22,8 @@ def init_toggled_button_groups(context, *group_ids: str):
     Args:
         *group_ids: Variable number of button group IDs.
     Returns:
-        Safe JavaScript code string.
+        Safe JavaScript code string, or nothing when the request's
+        InitializerRegistry collects the IDs for {% render_initializers %}.
     """
     group_ids = [group_id.strip() for group_id in group_ids]
     reserved_suffix = "-toggled-button-group"
@@ -40,7 +42,13 @@ def init_toggled_button_groups(context, *group_ids: str):
             )
     context['TOGGLED_BUTTON_GROUPS_INITIALIZED'] = True
 
-    module_path = static("BaseApp/modules/ToggledButtonGroup.mjs")
+    registry = get_initializer_registry(context)
+    if registry is not None:
+        registry.add_ids("ToggledButtonGroup",
+                         "BaseApp/modules/ToggledButtonGroup.mjs", group_ids)
+        return ''
+
+    module_path = module_url("BaseApp/modules/ToggledButtonGroup.mjs")
     js_code = f"""
         <script type="module">
             import {{ ToggledButtonGroup }} from "{module_path}";
@@ -1,8 +1,9 @@
 import re
 from django import template
-from django.templatetags.static import static
 from django.utils.safestring import mark_safe
 from BaseApp.exceptions import TemplateTagInitError
+from BaseApp.initializers import get_initializer_registry
+from BaseApp.modules import module_url
 from BaseApp.utils import get_module_logger
 
 module_logger = get_module_logger("templatetags", __file__)
@@ -15,7 +16,7 @@ VALID_TOGGLE_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_\-]+$')
 @register.simple_tag(takes_context=True)
 def init_content_toggles(context, *toggle_ids):
     module_logger.debug(
-        f"init_content_toggles tag generated JavaScript code: toggle_ids: {toggle_ids}")
+        "init_content_toggles tag generated JavaScript code: toggle_ids: {}", toggle_ids)
     toggle_ids = [str(toggle_id).strip()
                   for toggle_id in toggle_ids if toggle_id]
     reserved_suffix = "-toggle-container"
@@ -34,7 +35,14 @@ def init_content_toggles(context, *toggle_ids):
             )
     context['CONTENT_TOGGLES_INITIALIZED'] = True
 
-    module_path = static("BaseApp/modules/ContentToggleHandler.mjs")
+    # THE LAYOUT INITIALIZES ALL TOGGLES OF THE REQUEST IN ONE SCRIPT
+    registry = get_initializer_registry(context)
+    if registry is not None:
+        registry.add_ids("ContentToggleHandler",
+                         "BaseApp/modules/ContentToggleHandler.mjs", toggle_ids)
+        return ''
+
+    module_path = module_url("BaseApp/modules/ContentToggleHandler.mjs")
     js_code = f"""
         <script type="module">
             import {{ ContentToggleHandler }} from "{module_path}";
@@ -0,0 +1,38 @@
+from django import template
+
+from BaseApp.initializers import InitializerRegistry, get_initializer_registry
+from BaseApp.modules import module_url
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def render_initializers(context):
+    """
+    Emits the single script initializing everything the init tags registered.
+    Put it once at the very end of the layout, after every block.
+
+    Example usage:
+        {% load initializer_tags %}
+        {% render_initializers %}
+    """
+    registry = get_initializer_registry(context)
+    if registry is None:
+        # the tags already rendered inline scripts, keep the swap target
+        registry = InitializerRegistry()
+    return registry.render_element()
+
+
+@register.simple_tag(takes_context=True)
+def import_module(context, module_path):
+    """
+    Returns the URL to import a module from, and preloads its imports.
+    For the modules a template imports itself rather than through an init tag.
+
+    Example usage:
+        import { Modal } from "{% import_module 'BaseApp/modules/modal_handler.mjs' %}";
+    """
+    registry = get_initializer_registry(context)
+    if registry is not None:
+        registry.add_preload(module_path)
+    return module_url(module_path)
@@ -1,6 +1,6 @@
 from django import template
 
-from BaseApp.menus import navbar_items
+from BaseApp.menus import nav_registry
 
 from BaseApp.utils import get_module_logger
 
@@ -9,13 +9,13 @@ logger = get_module_logger("menu_tags", __file__)
 register = template.Library()
 
 
-@register.inclusion_tag('BaseApp/navigation/nav_dropdown_buttons.html')
-def top_navbar_buttons():
+@register.simple_tag
+def top_navbar_buttons(active_section=None):
     """
-    Returns a dictionary of nav items
+    Returns the rendered nav dropdown buttons, cached by the nav registry
     """
-    logger.debug(f"navbar_items: {navbar_items}")
-    return {'navbar_items': navbar_items}
+    logger.debug("navbar_items: {}", nav_registry.items)
+    return nav_registry.render(active_section)
 
 
 @register.inclusion_tag('BaseApp/navigation/back_button.html', takes_context=True)
@@ -1,12 +1,32 @@
 import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
-from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.template import Template, Context
 from django.templatetags.static import static
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse, reverse_lazy
+from loguru import logger
 
-from BaseApp.utils import get_parent_folder, get_module_logger, bleach_clean_value, join_paths
+from BaseApp.utils import Lazy, get_parent_folder, get_module_logger, bleach_clean_value, join_paths
 from BaseApp.templatetags.button_group_tags import init_toggled_button_groups
 from BaseApp.exceptions import TemplateTagInitError
+from BaseApp.initializers import InitializerRegistry
+from BaseApp.menus import NavRegistry, nav_registry
+from BaseApp.modules import module_graph
+from BaseApp.partials import NO_CACHE, PartialRegistry, partial_registry
+from BaseApp.storage import CompressedManifestStaticFilesStorage
+from BaseApp.log_router import LogFile, LogRouter, flush_logs
+from BaseApp.middleware import InitializerMiddleware, accepted_encodings
+from BaseApp.timing import RequestTimings
+from FlashCardApp.models import Card, Deck, Question
 
 
 class UtilsTests(SimpleTestCase):
@@ -22,8 +42,9 @@ class UtilsTests(SimpleTestCase):
             get_parent_folder(__file__), "logs", f"{module_name}.log")
         # Check if the log file is created in the correct path
         self.assertTrue(os.path.exists(expected_log_file_path))
-        # Log a message to the logger
+        # Log a message to the logger, it is written by a background thread
         test_logger.info("Test message")
+        flush_logs()
         with open(expected_log_file_path, "r") as log_file:
             self.assertIn("Test message", log_file.read())
         # Check if the log file contains the expected message
@@ -53,6 +74,137 @@ class UtilsTests(SimpleTestCase):
         self.assertEqual(join_paths(*paths), expected_output)
 
 
+class ModuleLoggerTests(SimpleTestCase):
+    """
+    Test the level gating of the loggers returned by get_module_logger
+    """
+
+    def setUp(self):
+        self.module_logger = get_module_logger("test_module_levels", __file__)
+        self.log_file_path = os.path.join(
+            get_parent_folder(__file__), "logs", "test_module_levels.log")
+        self.addCleanup(os.remove, self.log_file_path)
+
+    def read_log(self):
+        flush_logs()
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_disabled_levels_do_not_format_arguments(self):
+        """Test that lazy arguments are only evaluated for enabled levels."""
+        calls = []
+        with override_settings(LOG_LEVELS={"test_module_levels": "INFO"}):
+            self.assertFalse(self.module_logger.is_enabled_for("DEBUG"))
+            self.module_logger.debug("debug {}", Lazy(lambda: calls.append("debug")))
+            self.module_logger.info("info {}", Lazy(lambda: calls.append("info") or "done"))
+        self.assertEqual(calls, ["info"])
+        log = self.read_log()
+        self.assertIn("info done", log)
+        self.assertNotIn("debug", log)
+
+    def test_plain_callables_are_not_called(self):
+        """Test that only arguments wrapped in Lazy are evaluated."""
+        calls = []
+
+        def handler():
+            calls.append("handler")
+
+        self.module_logger.info("handler {}", handler)
+        self.assertEqual(calls, [])
+        self.assertIn("handler <function", self.read_log())
+
+    def test_level_follows_settings(self):
+        """Test that the cached level is refreshed when the settings change."""
+        with override_settings(LOG_LEVEL="ERROR", LOG_LEVELS={}):
+            self.assertFalse(self.module_logger.is_enabled_for("WARNING"))
+        self.assertTrue(self.module_logger.is_enabled_for("DEBUG"))
+
+
+class LogRouterTests(SimpleTestCase):
+    """
+    Test the single sink behind get_module_logger
+    """
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir)
+        self.router = LogRouter(maxsize=10)
+        self.addCleanup(self.remove_router)
+
+    def remove_router(self):
+        if self.router._handler_id is not None:
+            logger.remove(self.router._handler_id)
+
+    def test_repeat_registrations_are_deduplicated(self):
+        """Test that registering a module twice adds neither a route nor a sink."""
+        path = os.path.join(self.log_dir, "templatetags.log")
+        self.router.register("templatetags", path)
+        handler_id = self.router._handler_id
+        self.router.register("templatetags", path)
+        self.assertEqual(self.router.routes["templatetags"], (path,))
+        self.assertEqual(self.router._handler_id, handler_id)
+
+    def test_records_are_routed_by_module_name(self):
+        """Test that each record only reaches the file of its module."""
+        views_path = os.path.join(self.log_dir, "views.log")
+        models_path = os.path.join(self.log_dir, "models.log")
+        self.router.register("views", views_path)
+        self.router.register("models", models_path)
+        for number in range(50):  # more records than the queue holds
+            logger.bind(name="views").info(f"view record {number}")
+        logger.bind(name="models").info("model record")
+        self.router.drain()
+        with open(views_path, "r") as log_file:
+            views_log = log_file.read()
+        with open(models_path, "r") as log_file:
+            models_log = log_file.read()
+        self.assertEqual(views_log.count("view record"), 50)
+        self.assertNotIn("model record", views_log)
+        self.assertIn("model record", models_log)
+
+    def test_writer_survives_failed_records(self):
+        """Test that a record failing with any exception doesn't stop the writer thread."""
+        path = os.path.join(self.log_dir, "views.log")
+        self.router.register("views", path)
+        # a route without its file fails with a KeyError in the writer
+        self.router.routes["broken"] = (os.path.join(self.log_dir, "broken.log"),)
+        with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+            logger.bind(name="broken").info("lost record")
+            self.router.drain()
+        self.assertIn("log-router failed to write broken record", stderr.getvalue())
+        for number in range(20):  # more records than the queue holds
+            logger.bind(name="views").info(f"view record {number}")
+        self.router.drain()
+        with open(path, "r") as log_file:
+            self.assertEqual(log_file.read().count("view record"), 20)
+
+    def test_deleted_log_files_are_recreated_and_reopened(self):
+        """Test that registering again recreates a deleted log file and the writer switches to it."""
+        path = os.path.join(self.log_dir, "views.log")
+        self.router.register("views", path)
+        logger.bind(name="views").info("first record")
+        self.router.drain()
+        os.remove(path)
+        self.router.register("views", path)
+        self.assertTrue(os.path.exists(path))
+        logger.bind(name="views").info("second record")
+        self.router.drain()
+        with open(path, "r") as log_file:
+            self.assertIn("second record", log_file.read())
+
+    def test_log_files_are_rotated_and_zipped(self):
+        """Test that a full log file is moved into a zip next to it."""
+        path = os.path.join(self.log_dir, "views.log")
+        log_file = LogFile(path, rotation_bytes=100)
+        log_file.write("a" * 80)
+        log_file.write("b" * 80)
+        log_file.close()
+        archives = [name for name in os.listdir(self.log_dir) if name.endswith(".zip")]
+        self.assertEqual(len(archives), 1)
+        with open(path, "r") as current_file:
+            self.assertEqual(current_file.read(), "b" * 80)
+
+
 class InitToggledButtonGroupsTagTest(TestCase):
     """
     Test the init_toggled_button_groups template tag
@@ -153,3 +305,365 @@ class InitToggledButtonGroupsTagTest(TestCase):
 
         with self.assertRaises(TemplateTagInitError):
             template.render(Context({}))
+
+
+class InitializerRegistryTests(TestCase):
+    """
+    Test that init tags rendered for a request share a single initializer script
+    """
+
+    def render_with_registry(self, template_string):
+        request = RequestFactory().get('/')
+        request.initializer_registry = InitializerRegistry()
+        rendered = Template(template_string).render(Context({'request': request}))
+        return rendered, request.initializer_registry
+
+    @override_settings(STATIC_URL='/static/')
+    def test_tags_register_instead_of_emitting_scripts(self):
+        """Test that the tags emit nothing and the registry renders one call per module."""
+        rendered, registry = self.render_with_registry(
+            "{% load button_group_tags content_toggle_tags action_invoker_tags %}"
+            "{% for i in '123' %}{% init_content_toggles 'card-'|add:i %}"
+            "{% init_toggled_button_groups 'answer-'|add:i %}{% endfor %}"
+            "{% invoke_action 'on-load' 'click' 'last' 'tech-info' %}")
+        self.assertNotIn('<script', rendered)
+
+        script = registry.render_script()
+        self.assertEqual(script.count('<script'), 1)
+        self.assertEqual(script.count('import'), 3)
+        self.assertIn('ContentToggleHandler.initAll("card-1 card-2 card-3");', script)
+        self.assertIn('ToggledButtonGroup.initAll("answer-1 answer-2 answer-3");', script)
+        self.assertIn('ActionInvoker.initAll([{"event": "on-load", "action": "click", '
+                      '"targetId": "tech-info", "strategy": "last"}]);', script)
+        # rendering empties the registry
+        self.assertFalse(registry)
+
+    def test_layout_tag_renders_registered_initializers(self):
+        """Test that render_initializers emits the script of the tags rendered before it."""
+        rendered, registry = self.render_with_registry(
+            "{% load content_toggle_tags initializer_tags %}"
+            "{% init_content_toggles 'basic' %}{% render_initializers %}")
+        self.assertIn('<div id="page-initializers"><script type="module">', rendered)
+        self.assertIn('ContentToggleHandler.initAll("basic");', rendered)
+        self.assertFalse(registry)
+
+    def test_htmx_partials_get_one_out_of_band_script(self):
+        """Test that the middleware appends pending initializers to HTMX responses."""
+        user = get_user_model().objects.create_user(
+            username='deckauthor', email='deckauthor@example.com', password='password123')
+        deck = Deck.objects.create(name='Deck', author=user, description='A deck')
+        questions = Question.objects.bulk_create([
+            Question(type=Question.QuestionType.TRUE_FALSE, question=f'Q{number}', answer='True')
+            for number in range(20)
+        ])
+        Card.objects.bulk_create([Card(deck=deck, question=question) for question in questions])
+
+        response = self.client.get(
+            reverse('FlashCardApp:deck_detail', args=[deck.id]), HTTP_HX_REQUEST='true')
+        content = response.content.decode()
+        self.assertEqual(content.count('<script type="module">'), 1)
+        self.assertIn('<div id="page-initializers" hx-swap-oob="true">', content)
+        self.assertEqual(content.count('ContentToggleHandler.initAll('), 1)
+
+
+@override_settings(STATIC_URL='/static/')
+class ModulePreloadTests(TestCase):
+    """
+    Test that pages preload the import graph of the modules they use
+    """
+
+    def test_closure_follows_imports(self):
+        closure = module_graph.closure(['BaseApp/modules/ActionInvoker.mjs'])
+        self.assertEqual(closure[0], 'BaseApp/modules/ActionInvoker.mjs')
+        for dependency in ('LoggingUtils', 'ConfigValidator', 'strategies'):
+            self.assertIn(f'BaseApp/modules/{dependency}.mjs', closure)
+        self.assertEqual(len(closure), len(set(closure)))
+
+    def test_full_page_preloads_in_head(self):
+        content = self.client.get(reverse('BaseApp:ui-elements')).content.decode()
+        head = content[:content.index('</head>')]
+        for module in ('modal_handler', 'ToggledButtonGroup', 'HtmxHandler', 'strategies'):
+            self.assertIn(f'<link rel="modulepreload" href="/static/BaseApp/modules/{module}.mjs">', head)
+        self.assertEqual(content.count('rel="modulepreload"'), head.count('rel="modulepreload"'))
+
+    def test_htmx_partial_carries_its_preloads(self):
+        user = get_user_model().objects.create_user(
+            username='deckauthor', email='deckauthor@example.com', password='password123')
+        deck = Deck.objects.create(name='Deck', author=user, description='A deck')
+        question = Question.objects.create(
+            type=Question.QuestionType.TRUE_FALSE, question='Q', answer='True')
+        Card.objects.create(deck=deck, question=question)
+        content = self.client.get(reverse('FlashCardApp:deck_detail', args=[deck.id]),
+                                  HTTP_HX_REQUEST='true').content.decode()
+        element = content[content.index('<div id="page-initializers" hx-swap-oob="true">'):]
+        self.assertIn('href="/static/BaseApp/modules/LoggingUtils.mjs"', element)
+        self.assertLess(element.index('rel="modulepreload"'), element.index('<script'))
+
+    @override_settings(MODULE_BUNDLE='BaseApp/bundle.mjs')
+    def test_bundle_replaces_modules(self):
+        registry = InitializerRegistry()
+        registry.add_ids("ContentToggleHandler", "BaseApp/modules/ContentToggleHandler.mjs", ["basic"])
+        self.assertEqual(registry.render_preloads(),
+                         '<link rel="modulepreload" href="/static/BaseApp/bundle.mjs">')
+        self.assertIn('import { ContentToggleHandler } from "/static/BaseApp/bundle.mjs";',
+                      registry.render_script())
+
+    def test_bundle_command_needs_esbuild(self):
+        with mock.patch('shutil.which', return_value=None):
+            with self.assertRaises(CommandError):
+                call_command('bundle_modules', stdout=StringIO())
+
+
+class InitializerMiddlewareTests(SimpleTestCase):
+    """
+    Test where the initializers left over by a view end up in full pages
+    """
+
+    def get_page(self, content):
+        def view(request):
+            request.initializer_registry.add_ids(
+                "ContentToggleHandler", "BaseApp/modules/ContentToggleHandler.mjs", ["basic"])
+            return HttpResponse(content)
+
+        return InitializerMiddleware(view)(RequestFactory().get('/page/')).content.decode()
+
+    def test_script_goes_before_body_end(self):
+        content = self.get_page('<html><head></head><body><p>page</p></body></html>')
+        self.assertTrue(content.endswith('</script></body></html>'))
+        self.assertLess(content.index('rel="modulepreload"'), content.index('</head>'))
+
+    def test_script_goes_before_html_end_without_body(self):
+        content = self.get_page('<html><p>page</p></html>')
+        self.assertTrue(content.endswith('</script></html>'))
+        self.assertLess(content.index('rel="modulepreload"'), content.index('<script'))
+
+    def test_fragments_get_the_script_appended_with_a_warning(self):
+        with mock.patch('BaseApp.middleware.module_logger') as module_logger:
+            content = self.get_page('<p>page</p>')
+        self.assertTrue(content.startswith('<p>page</p>'))
+        self.assertTrue(content.endswith('</script>'))
+        module_logger.warning.assert_called_once()
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    """
+    Test the Server-Timing breakdown of sampled requests
+    """
+
+    def get_deck_detail(self):
+        user = get_user_model().objects.create_user(
+            username='deckauthor', email='deckauthor@example.com', password='password123')
+        deck = Deck.objects.create(name='Deck', author=user, description='A deck')
+        return self.client.get(
+            reverse('FlashCardApp:deck_detail', args=[deck.id]), HTTP_HX_REQUEST='true')
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+    def test_sampled_requests_get_a_server_timing_header(self):
+        """Test that the header holds every phase and counts the queries."""
+        response = self.get_deck_detail()
+        server_timing = response['Server-Timing']
+        for metric in ('total;dur=', 'view;dur=', 'db;dur=', 'tpl;dur=', 'cache;desc='):
+            self.assertIn(metric, server_timing)
+        # the deck and its cards
+        self.assertIn('desc="2 queries"', server_timing)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_timed(self):
+        """Test that sampling can be turned off."""
+        self.assertFalse(self.get_deck_detail().has_header('Server-Timing'))
+
+    def test_timings_count_nested_template_renders_once(self):
+        """Test that renders inside a render don't add to the template time twice."""
+        timings = RequestTimings()
+        with timings.template_render():
+            with timings.template_render():
+                pass
+            inner_total = timings.template
+        self.assertEqual(inner_total, 0.0)
+        self.assertGreater(timings.template, 0.0)
+
+
+class CompressedStaticFilesTests(SimpleTestCase):
+    """
+    Test the hashed, precompressed static files and the middleware serving them
+    """
+    module = "import { helper } from './helper.mjs';\n" + "export const answer = helper(42);\n" * 50
+    helper = "export function helper(value) { return value; }\n" * 50
+
+    def setUp(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        settings_override = override_settings(DEBUG=False, STATIC_ROOT=static_root, STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'BaseApp.storage.CompressedManifestStaticFilesStorage'},
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.storage = CompressedManifestStaticFilesStorage()
+        names = {'app/module.mjs': self.module, 'app/helper.mjs': self.helper}
+        for name, content in names.items():
+            self.storage.save(name, ContentFile(content))
+        list(self.storage.post_process({name: (self.storage, name) for name in names}))
+
+    def test_module_imports_are_hashed(self):
+        hashed_helper = self.storage.stored_name('app/helper.mjs')
+        with self.storage.open(self.storage.stored_name('app/module.mjs')) as module:
+            self.assertIn(f'from "./{hashed_helper.split("/")[-1]}";', module.read().decode())
+
+    def test_variants_are_written(self):
+        hashed_name = self.storage.stored_name('app/module.mjs')
+        for suffix in ('.gz', '.br'):
+            self.assertTrue(self.storage.exists(hashed_name + suffix))
+
+    def test_hashed_file_is_immutable_and_compressed(self):
+        url = static('app/module.mjs')
+        self.assertNotEqual(url, '/static/app/module.mjs')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response['Content-Type'], 'text/javascript')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_encoding_is_negotiated(self):
+        url = static('app/module.mjs')
+        gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        identity = self.client.get(url)
+        self.assertFalse(identity.has_header('Content-Encoding'))
+        self.assertEqual(identity.content.decode().count('export const answer'), 50)
+
+    def test_zero_quality_refuses_an_encoding(self):
+        response = self.client.get(static('app/module.mjs'),
+                                   HTTP_ACCEPT_ENCODING='br;q=0.000, gzip;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(accepted_encodings('br; q=0.0, gzip;q=0, identity'), {'identity'})
+        self.assertEqual(accepted_encodings('BR;q=0.001, gzip;q=bad'), {'br'})
+
+    def test_unhashed_name_is_not_immutable(self):
+        response = self.client.get('/static/app/module.mjs')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_missing_file_is_passed_on(self):
+        self.assertEqual(self.client.get('/static/app/missing.mjs').status_code, 404)
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+
+
+class NavRegistryTests(SimpleTestCase):
+    """
+    Test the lazy nav registry and the cached top navbar
+    """
+
+    def test_urls_are_reversed_on_first_use(self):
+        """Test that registering doesn't touch the URLconf."""
+        registry = NavRegistry()
+        registry.register("Tools", "Missing", 'BaseApp:does-not-exist')
+        with self.assertRaises(NoReverseMatch):
+            registry.items()
+
+    def test_items_are_resolved_once(self):
+        registry = NavRegistry()
+        registry.register("Components", "User Interface", 'BaseApp:ui-elements')
+        items = registry.items()
+        self.assertEqual(items["Components"][0].url, reverse('BaseApp:ui-elements'))
+        self.assertIs(registry.items(), items)
+
+    @override_settings(DEBUG=False)
+    def test_navbar_is_rendered_once_per_section(self):
+        """Test that the navbar tag renders the template once and then reuses it."""
+        template = Template("{% load menu_tags %}{% top_navbar_buttons %}")
+        with mock.patch('BaseApp.menus.render_to_string', wraps=render_to_string) as render:
+            first = template.render(Context({}))
+            second = template.render(Context({}))
+            nav_registry.render("Tools")
+        self.assertEqual(first, second)
+        self.assertIn(reverse('FlashCardApp:base'), first)
+        self.assertEqual(render.call_count, 2)
+
+    @override_settings(DEBUG=True)
+    def test_navbar_is_not_cached_in_debug(self):
+        with mock.patch('BaseApp.menus.render_to_string', wraps=render_to_string) as render:
+            nav_registry.render()
+            nav_registry.render()
+        self.assertEqual(render.call_count, 2)
+
+
+@override_settings(DEBUG=False)
+class StaticPartialViewTests(SimpleTestCase):
+    """
+    Test the HTTP caching of the static HTMX partials
+    """
+    url = reverse_lazy('BaseApp:partial', args=['toggled-content-examples'])
+
+    def get(self, **headers):
+        return self.client.get(self.url, HTTP_HX_REQUEST='true', **headers)
+
+    def test_partial_is_cacheable(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertIn('HX-Request', response['Vary'])
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_partial_is_rendered_once(self):
+        """Test that repeat requests are served from memory."""
+        self.get()
+        with mock.patch('BaseApp.partials.loader.get_template') as get_template:
+            response = self.get()
+        get_template.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+
+    def test_init_tags_share_one_script(self):
+        """Test that the toggles of all examples are initialized by a single script."""
+        content = self.get().content.decode()
+        self.assertEqual(content.count('<script type="module">'), 1)
+        self.assertEqual(content.count('ContentToggleHandler.initAll('), 1)
+
+
+class PartialRegistryTests(SimpleTestCase):
+    """
+    Test the registry behind the generic partial view
+    """
+
+    def setUp(self):
+        self.registry = PartialRegistry()
+
+    def test_unknown_partial_is_not_found(self):
+        response = self.client.get(reverse('BaseApp:partial', args=['no-such-partial']),
+                                   HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 404)
+
+    def test_non_htmx_request_is_redirected(self):
+        response = self.client.get(reverse('BaseApp:partial', args=['django-info']))
+        self.assertRedirects(response, reverse('BaseApp:home'), fetch_redirect_response=False)
+
+    def test_registered_templates_exist(self):
+        """Test that every registered partial has a loadable template."""
+        for partial in partial_registry:
+            with self.subTest(partial=partial.name):
+                partial.compile()
+
+    def test_dynamic_partial_renders_per_request(self):
+        partial = self.registry.register(
+            'greeting', 'BaseApp/home/partials/django_info.html',
+            context=lambda request: {'django_version': request.GET['version']},
+            cache=NO_CACHE)
+        for version in ('4.2', '5.0'):
+            request = RequestFactory().get('/', {'version': version})
+            response = partial.respond(request)
+            self.assertIn(version, response.content.decode())
+            self.assertFalse(response.has_header('ETag'))
+
+    def test_static_partial_needs_constant_context(self):
+        with self.assertRaises(ValueError):
+            self.registry.register('greeting', 'BaseApp/home/partials/django_info.html',
+                                   context=lambda request: {})
@@ -0,0 +1,144 @@
+"""
+Per request timings, collected while RequestTimingMiddleware (see
+BaseApp.middleware) samples a request and reported as a Server-Timing header.
+
+The timings of the current request live in a context variable, so the
+template backend and caches can report to it without being handed the
+request. Outside of a sampled request every hook is a no-op.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Durations (in seconds) and counters of one request.
+        - total: the whole request, as seen by the middleware
+        - view: from the view being called to the response being rendered
+        - db: time spent executing queries, and their count
+        - template: time spent rendering templates (nested renders count once)
+        - cache: fragment and response cache hits and misses
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.total = 0.0
+        self.view = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._template_depth = 0
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        """
+        Execute wrapper (see connection.execute_wrapper) timing every query.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    @contextmanager
+    def template_render(self):
+        self._template_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._template_depth -= 1
+            if not self._template_depth:
+                self.template += time.perf_counter() - started
+
+    def finish(self):
+        finished = time.perf_counter()
+        self.total = finished - self.started
+        if self.view_started is not None:
+            self.view = finished - self.view_started
+
+    def server_timing(self) -> str:
+        """
+        Returns the value of the Server-Timing header, durations in milliseconds.
+        """
+        return ", ".join([
+            f"total;dur={self.total * 1000:.1f}",
+            f"view;dur={self.view * 1000:.1f}",
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.template * 1000:.1f}",
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ])
+
+    def as_dict(self) -> dict:
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'view_ms': round(self.view * 1000, 2),
+            'db_ms': round(self.db * 1000, 2),
+            'queries': self.queries,
+            'template_ms': round(self.template * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def activate_timings(timings: RequestTimings):
+    """
+    Makes timings the current request's, returns the token to reset it with.
+    """
+    return _current_timings.set(timings)
+
+
+def deactivate_timings(token):
+    _current_timings.reset(token)
+
+
+def current_timings():
+    """
+    Returns the RequestTimings of the request being sampled, or None.
+    """
+    return _current_timings.get()
+
+
+def record_cache(hits: int, misses: int):
+    """
+    Counts cache lookups towards the current request, if it is sampled.
+    """
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.cache_hits += hits
+        timings.cache_misses += misses
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        with timings.template_render():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, reporting render times to the current request.
+    Used as TEMPLATES['BACKEND'] so every render, render_to_string and
+    TemplateResponse is timed without patching Django.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -1,8 +1,8 @@
 from django.urls import path
+from .partials import partial_view
 from .views import (
     BasePage, HomeView, UIElementView, ComponentsView, DocumentationView,
-    ButtonsView, CardsView, TypographyView, get_django_info, get_tailwind_info,
-    get_htmx_info, display_number, get_back_button
+    ButtonsView, CardsView, TypographyView, display_number, get_back_button
 )
 
 urlpatterns = [
@@ -15,24 +15,9 @@ urlpatterns = [
     path('components/', ComponentsView.as_view(), name="components"),
     path('documentation/', DocumentationView.as_view(), name="documentation"),
     # # H T M X - AJAX REQUESTS # #
-    path('django-info/', get_django_info, name="django-info"),
-    path('tailwind-info/', get_tailwind_info, name="tailwind-info"),
-    path('htmx-info/', get_htmx_info, name="htmx-info"),
-    path('ui-elements/buttons/examples/',
-         UIElementView.get_buttons_examples, name="buttons-examples"),
-    path('ui-elements/menus/examples/',
-         UIElementView.get_toggled_content_examples, name="toggled-content-examples"),
+    # every registered partial, see BaseApp.partials
+    path('partials/<slug:name>/', partial_view, name="partial"),
     path('display_number/', display_number, name="display_number"),
-    path('ui-elements/buttons/examples/minimal/',
-         UIElementView.get_button_example_minimal, name="button-example-minimal"),
-    path('ui-elements/content-toggle/basic/',
-         UIElementView.content_toggle_basic, name="content-toggle-basic"),
-    path('ui-elements/content-toggle/multi-toggle-panel/',
-         UIElementView.content_toggle_multi_toggle_panel, name="content-toggle-multi-toggle-panel"),
-    path('ui-elements/content-toggle/forloop-accordian/',
-         UIElementView.content_toggle_forloop_accordian, name="content-toggle-forloop-accordian"),
-    path('ui-elements/content-toggle/hover-dropdown/',
-         UIElementView.content_toggle_hover_dropdown, name="content-toggle-hover-dropdown"),
     path('ui-elements/back-button/<str:url>/<str:target_element>/',
          get_back_button, name="back-button"),
 ]
@@ -1,6 +1,10 @@
 import os
+import weakref
 
 from functools import wraps
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
@@ -8,7 +12,7 @@ from django.urls import reverse
 from loguru import logger
 from bleach import clean
 
-from .constants import LOG_FORMAT
+from .log_router import log_router
 
 
 def get_parent_folder(path: str):
@@ -19,24 +23,94 @@ def get_parent_folder(path: str):
     return os.path.dirname(path)
 
 
-def get_module_logger(module_name: str, file: str):
+class Lazy:
     """
-    Returns a logger for a specific module.
+    Marks a ModuleLogger argument to be computed only when the record is emitted.
+    Other arguments are passed as they are, callables included.
+        - func: Called without arguments, its result is formatted in the message.
+    """
+    __slots__ = ('func',)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self):
+        return self.func()
+
+
+def _level_method(level_name: str):
+    level_no = logger.level(level_name).no
+
+    def log(self, message: str, *args, **kwargs):
+        if level_no >= self.level_no:
+            args = [arg() if isinstance(arg, Lazy) else arg for arg in args]
+            self._logger.opt(depth=1).log(level_name, message, *args, **kwargs)
+    log.__name__ = level_name.lower()
+    log.__doc__ = f"Logs at {level_name} level, nothing is formatted below the module's level."
+    return log
+
+
+class ModuleLogger:
+    """
+    Level gated facade over the loguru logger bound to a module.
+    The module's level comes from settings.LOG_LEVELS[module_name], falling
+    back to settings.LOG_LEVEL and then DEBUG, and is cached on the instance.
+    Records below it cost one comparison: messages take str.format arguments
+    that are only formatted when the record is emitted, and those wrapped in
+    Lazy are only computed then.
+
+    Example usage:
+        module_logger.debug("navbar_items: {}", navbar_items)
+        module_logger.debug("stats: {}", Lazy(cache_stats.snapshot))
+    Anything else (exception, opt, remove...) is the bound loguru logger's.
+    """
+    _instances = weakref.WeakSet()
+
+    def __init__(self, module_name: str, bound_logger):
+        self.module_name = module_name
+        self._logger = bound_logger
+        self.refresh_level()
+        ModuleLogger._instances.add(self)
+
+    def refresh_level(self):
+        level_name = getattr(settings, 'LOG_LEVELS', {}).get(
+            self.module_name, getattr(settings, 'LOG_LEVEL', "DEBUG"))
+        self.level_no = logger.level(level_name).no
+
+    def is_enabled_for(self, level_name: str) -> bool:
+        return logger.level(level_name).no >= self.level_no
+
+    trace = _level_method("TRACE")
+    debug = _level_method("DEBUG")
+    info = _level_method("INFO")
+    success = _level_method("SUCCESS")
+    warning = _level_method("WARNING")
+    error = _level_method("ERROR")
+    critical = _level_method("CRITICAL")
+
+    def __getattr__(self, name):
+        return getattr(self._logger, name)
+
+
+@receiver(setting_changed)
+def refresh_module_logger_levels(setting, **kwargs):
+    if setting in ('LOG_LEVELS', 'LOG_LEVEL'):
+        for module_logger in list(ModuleLogger._instances):
+            module_logger.refresh_level()
+
+
+def get_module_logger(module_name: str, file: str) -> ModuleLogger:
+    """
+    Returns a logger for a specific module, see ModuleLogger.
+    Its records are written to logs/{module_name}.log next to the file
+    by the background writer of BaseApp.log_router, repeat calls are cheap.
         - module_name: The name of the module.
         - file: The file path to the log file.
     """
     log_file_path = os.path.join(get_parent_folder(
         file), "logs", f"{module_name}.log")
-    module_logger = logger.bind(name=module_name)
-    module_logger.add(
-        log_file_path,
-        format=LOG_FORMAT,
-        level="DEBUG",
-        filter=lambda record: record["extra"].get("name") == module_name,
-        rotation="10 MB",
-        compression="zip",
-    )
-    return module_logger
+    log_router.register(module_name, log_file_path)
+    return ModuleLogger(module_name, logger.bind(name=module_name))
 
 
 def bleach_clean_value(value):
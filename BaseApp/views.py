@@ -36,102 +36,12 @@ class HomeView(BasePage):
     header_is_extended = True
 
 
-def get_django_info(request):
-    template = loader.get_template('BaseApp/home/partials/django_info.html')
-    context = {
-        'django_version': "???",
-    }
-    return HttpResponse(template.render(context, request))
-
-
-def get_tailwind_info(request):
-    module_logger.debug("get_tailwind_info")
-    template = loader.get_template(
-        'BaseApp/home/partials/tailwind_partial.html')
-    context = {
-        'tailwind_version': "?",
-    }
-    return HttpResponse(template.render(context, request))
-
-
-def get_htmx_info(request):
-    template = loader.get_template(
-        'BaseApp/home/partials/htmx_info.html')
-    context = {
-        'htmx_version': "??",
-    }
-    return HttpResponse(template.render(context, request))
-
-
 class UIElementView(BasePage):
     template_name = 'BaseApp/ui_elements/base.html'
     title = "User Interface Elements"
     page_description = ""
     header_is_extended = True
 
-    @require_htmx
-    @staticmethod
-    def get_buttons_examples(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/sections/buttons_examples.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
-    @require_htmx
-    @staticmethod
-    def get_toggled_content_examples(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/sections/toggled_content_examples.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
-    @require_htmx
-    @staticmethod
-    def get_button_example_minimal(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/partials/buttons/button_example_minimal.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
-    @require_htmx
-    @staticmethod
-    def content_toggle_basic(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/partials/content_toggle/basic.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
-    @require_htmx
-    @staticmethod
-    def content_toggle_multi_toggle_panel(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/partials/content_toggle/multi_toggle_panel.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
-    @require_htmx
-    @staticmethod
-    def content_toggle_forloop_accordian(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/partials/content_toggle/forloop_accordian.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
-    @require_htmx
-    @staticmethod
-    def content_toggle_hover_dropdown(request):
-        template = loader.get_template(
-            'BaseApp/ui_elements/partials/content_toggle/hover_dropdown.html')
-        context = {
-        }
-        return HttpResponse(template.render(context, request))
-
 
 class ComponentsView(BasePage):
     template_name = 'BaseApp/components.html'
@@ -164,7 +74,7 @@ def display_number(request):
         # Retrieve the button value from the POST daa
         number = request.POST.get('number')
         # Log the received number (for debugging)
-        module_logger.info(f"Received number: {number}")
+        module_logger.info("Received number: {}", number)
 
         # Render the template with the number
         template = loader.get_template('BaseApp/tests/number_display.html')
@@ -1,21 +1,298 @@
+import threading
+import time
+from collections import OrderedDict
+
 from django.db import models
+from django.template import loader
+
+from BaseApp.cache import FragmentCache
+from BaseApp.pagination import (
+    KeysetPage, KeysetPaginator, InvalidCursorError, decode_cursor, encode_cursor
+)
+
+from .models import BlogListingVersion, BlogPost
+from .search import (
+    SEARCH_RESULT_LIMIT, get_search_backend, normalize_search_text, selected_fields
+)
+
+
+class SearchResultCache:
+    """
+    Per process LRU cache of search results (ranked id lists), bounded by
+    max_entries and expiring after ttl seconds.
+
+    The search box fires a request per keystroke, so "dja" usually follows
+    "dj". Every post matching "dja" also matches "dj", so when the cached
+    result of a shorter prefix is complete and holds at most refine_limit
+    posts, the longer query is answered by filtering that result in memory.
+    Those small results keep the searchable words of their posts for this,
+    split by the backend's tokenizer so they match what the index matches.
+    A refined result keeps the rank order of the prefix's result, which
+    approximates the index's order for the longer query (the matches are
+    the same, the bm25 scores of the longer tokens are not recomputed).
+
+    Every key holds the listing version the result was computed for (see
+    get_blog_listing_version), so once a post changes every process misses
+    its old entries and asks the index again; they are dropped by the LRU
+    or their ttl.
+    """
+    # the fields of BlogPost holding the text of each search field
+    field_paths = {'title': 'title', 'intro': 'intro',
+                   'author': 'author__username', 'content': 'content'}
+
+    def __init__(self, max_entries=256, ttl=60, refine_limit=200):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.refine_limit = refine_limit
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def search(self, search_query, fields, limit, backend, version=''):
+        """
+        Returns the ranked post ids for the query, from the cache when possible.
+        Only entries stored with the same version are used.
+        """
+        if not backend.is_available():
+            # icontains lookups match substrings, prefixes can't be refined
+            key = (version, search_query.casefold(), fields, limit)
+            post_ids = self._get(key)
+            if post_ids is None:
+                post_ids = backend.search_ids(search_query, fields, limit)
+                self._set(key, post_ids, None)
+            return post_ids
+
+        normalized_query = normalize_search_text(search_query, backend.tokenize)
+        key = (version, normalized_query, fields, limit)
+        post_ids = self._get(key)
+        if post_ids is not None:
+            return post_ids
+        post_ids = self._refine(version, normalized_query, fields, limit)
+        if post_ids is None:
+            post_ids = backend.search_ids(normalized_query, fields, limit)
+            documents = None
+            if len(post_ids) <= self.refine_limit and len(post_ids) < limit:
+                documents = self._load_documents(post_ids, fields, backend)
+            self._set(key, post_ids, documents)
+        return post_ids
+
+    def _get(self, key):
+        entry = self._get_entry(key)
+        return None if entry is None else entry[0]
+
+    def _get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
 
-from .models import BlogPost
+    def _set(self, key, post_ids, documents):
+        with self._lock:
+            self._entries[key] = (post_ids, documents, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refine(self, version, normalized_query, fields, limit):
+        """
+        Filters the cached result of the longest cached prefix of the query.
+        Returns None if no prefix can answer the query.
+        """
+        tokens = normalized_query.split()
+        for end in range(len(normalized_query) - 1, 0, -1):
+            prefix = normalized_query[:end].strip()
+            if not prefix or prefix != normalized_query[:end]:
+                continue
+            entry = self._get_entry((version, prefix, fields, limit))
+            if entry is None or entry[1] is None:
+                continue
+            documents = entry[1]
+            post_ids = [
+                post_id for post_id in entry[0]
+                if all(any(word.startswith(token) for word in documents[post_id])
+                       for token in tokens)
+            ]
+            self._set((version, normalized_query, fields, limit), post_ids,
+                      {post_id: documents[post_id] for post_id in post_ids})
+            return post_ids
+        return None
+
+    def _load_documents(self, post_ids, fields, backend):
+        """
+        Returns the searchable words of each post, keyed by post id.
+        """
+        if not post_ids:
+            return {}
+        paths = [self.field_paths[field] for field in fields]
+        documents = {}
+        for row in BlogPost.objects.filter(pk__in=post_ids).values_list('pk', *paths):
+            documents[row[0]] = frozenset(
+                word for text in row[1:] if text for word in backend.tokenize(text))
+        return documents
+
+
+search_result_cache = SearchResultCache()
+
+
+def search_blog_post_ids(search_query, title=True, intro=True, author=True, content=False,
+                         limit=SEARCH_RESULT_LIMIT):
+    """
+    Search blog posts by specified fields using the full-text index.
+    Returns a list of post ids, best match first.
+    Results are memoized by search_result_cache, checked against the
+    listing version (one primary key lookup).
+    """
+    fields = selected_fields(title=title, intro=intro,
+                             author=author, content=content)
+    return search_result_cache.search(search_query, fields, limit, get_search_backend(),
+                                      get_blog_listing_version())
+
+
+def invalidate_search_results():
+    """
+    Drops the cached search results of this process. Other processes miss
+    them anyway once the listing version is bumped.
+    """
+    search_result_cache.clear()
 
 
 def search_blog_posts(search_query, title=True, intro=True, author=True, content=False):
     """
     Search blog posts by specified fields.
+    The queryset is ordered by relevance, best match first.
+    """
+    post_ids = search_blog_post_ids(
+        search_query, title=title, intro=intro, author=author, content=content)
+    if not post_ids:
+        return BlogPost.objects.none()
+    search_rank = models.Case(
+        *[models.When(pk=pk, then=models.Value(rank))
+          for rank, pk in enumerate(post_ids)],
+        output_field=models.IntegerField(),
+    )
+    return BlogPost.objects.filter(pk__in=post_ids).annotate(
+        search_rank=search_rank).order_by('search_rank')
+
+
+BLOG_POST_ORDERING = ('-created_at', '-id')
+# the columns blog_card.html renders, author and category are joined in
+BLOG_CARD_FIELDS = (
+    'id', 'title', 'intro', 'color', 'title_length', 'intro_length',
+    'created_at', 'updated_at', 'author_username', 'category_name',
+)
+
+
+def blog_card_rows(queryset):
+    """
+    Projects a BlogPost queryset onto the columns a blog card renders.
+    Rows are lightweight named tuples, the author and category are joined
+    in the same query and the large content column is never fetched.
+    """
+    return queryset.annotate(
+        author_username=models.F('author__username'),
+        category_name=models.F('category__name'),
+    ).values_list(*BLOG_CARD_FIELDS, named=True)
+
+
+def get_blog_post_page(search_query='', cursor=None, page_size=8, category_id=None):
+    """
+    Returns a KeysetPage of blog card rows (see blog_card_rows) for the infinite scroll.
+    Without a search query posts are paged newest first on (created_at, id).
+    With a search query the ranked ids of the index are paged instead,
+    the cursor then holds the offset into that bounded list.
+    Both can be restricted to the category with the given id.
+    Raises InvalidCursorError for cursors that were not issued by this function.
+    """
+    if not search_query:
+        blog_posts = BlogPost.objects.all()
+        if category_id is not None:
+            blog_posts = blog_posts.filter(category_id=category_id)
+        paginator = KeysetPaginator(
+            blog_card_rows(blog_posts), BLOG_POST_ORDERING, page_size)
+        return paginator.get_page(cursor)
+
+    offset = 0
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+            raise InvalidCursorError("Cursor does not belong to a search.")
+        offset = values[0]
+    post_ids = search_blog_post_ids(search_query)
+    if category_id is not None and post_ids:
+        in_category = set(BlogPost.objects.filter(
+            pk__in=post_ids, category_id=category_id).values_list('pk', flat=True))
+        post_ids = [pk for pk in post_ids if pk in in_category]
+    page_ids = post_ids[offset:offset + page_size]
+    rows_by_id = {row.id: row for row in blog_card_rows(
+        BlogPost.objects.filter(pk__in=page_ids))}
+    posts = [rows_by_id[pk] for pk in page_ids if pk in rows_by_id]
+    has_next = offset + page_size < len(post_ids)
+    next_cursor = encode_cursor([offset + page_size]) if has_next else None
+    return KeysetPage(posts, has_next, next_cursor)
+
+
+blog_card_cache = FragmentCache("blog_card")
+
+
+def blog_card_version(post) -> str:
+    """
+    Everything a card shows that can change: the post (through updated_at),
+    its author's username and its category's name. Renaming an author or a
+    category changes the version, so every process re-renders the card
+    without having to delete it.
     """
-    query = models.Q()
+    return f"{post.updated_at.isoformat()}|{post.author_username}|{post.category_name}"
 
-    if title:
-        query |= models.Q(title__icontains=search_query)
-    if intro:
-        query |= models.Q(intro__icontains=search_query)
-    if author:
-        query |= models.Q(author__username__icontains=search_query)
-    if content:
-        query |= models.Q(content__icontains=search_query)
 
-    return BlogPost.objects.filter(query)
+def render_blog_cards(posts) -> list:
+    """
+    Returns the rendered blog_card.html of every post row (see blog_card_rows), in order.
+    Cards are cached per post and re-rendered when their blog_card_version changes.
+    """
+    template = loader.get_template('BlogApp/partials/blog_card.html')
+    return blog_card_cache.render_many(
+        posts,
+        key=lambda post: post.id,
+        version=blog_card_version,
+        render=lambda post: template.render({'post': post}),
+    )
+
+
+# the row created by migration 0011
+BLOG_LISTING_VERSION_PK = 1
+
+
+def get_blog_listing_version() -> str:
+    """
+    Returns an opaque version of everything the blog listing shows.
+    It changes whenever a post, author name or category name changes.
+    One primary key lookup, so listing responses are validated without
+    rendering and every process agrees on the version.
+    """
+    version = BlogListingVersion.objects.filter(
+        pk=BLOG_LISTING_VERSION_PK).values_list('version', flat=True).first()
+    return str(version or 0)
+
+
+def bump_blog_listing_version():
+    if not BlogListingVersion.objects.filter(pk=BLOG_LISTING_VERSION_PK).update(
+            version=models.F('version') + 1):
+        BlogListingVersion.objects.get_or_create(
+            pk=BLOG_LISTING_VERSION_PK, defaults={'version': 1})
+
+
+def invalidate_blog_listing():
+    """
+    Drops the search results and every listing response, e.g. after a post
+    was saved. Cached cards need no invalidation, see blog_card_version.
+    """
+    invalidate_search_results()
+    bump_blog_listing_version()
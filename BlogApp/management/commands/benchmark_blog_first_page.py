@@ -0,0 +1,58 @@
+import timeit
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from BlogApp.views import blog_post_list_cache_key
+
+
+class Command(BaseCommand):
+    help = ('Compares server time and requests per blog page view, with and without the inline first page, '
+            'and estimates the time to first content from an assumed round trip')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=200,
+                            help='Page views per measurement')
+        parser.add_argument('--rtt', type=float, default=50,
+                            help='Assumed network round trip per request, in milliseconds, '
+                                 'used for the time to first content estimate')
+
+    def handle(self, *args, **options):
+        views = options['views']
+        rtt = options['rtt'] / 1000
+        client = Client()
+        blog_url = reverse('BlogApp:blog')
+        posts_url = reverse('BlogApp:blog-posts')
+
+        def view_before():
+            # what the page did before: an empty shell, then a load-triggered request
+            with mock.patch('BlogApp.views.get_cached_blog_post_list', return_value=''):
+                client.get(blog_url)
+            client.get(posts_url, HTTP_HX_REQUEST='true')
+
+        def view_after():
+            client.get(blog_url)
+
+        def per_view(function):
+            # only the page both variants render, other entries of the cache are left alone
+            cache.delete(blog_post_list_cache_key({}))
+            function()  # warm up
+            return timeit.timeit(function, number=views) / views
+
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'],
+                               REQUEST_TIMING_SAMPLE_RATE=0):
+            before = per_view(view_before)
+            after = per_view(view_after)
+
+        for label, requests, seconds in [('before', 2, before), ('after', 1, after)]:
+            first_content = (seconds + requests * rtt) * 1000
+            self.stdout.write(
+                f'{label:>6}: {requests} requests per view | server {seconds * 1000:7.2f} ms (measured) | '
+                f'time to first content ~{first_content:7.2f} ms (estimated)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Time to first content is an estimate: measured server time plus an assumed '
+            f'{options["rtt"]:.0f} ms per request, browser rendering excluded'))
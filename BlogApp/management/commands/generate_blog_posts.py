@@ -1,25 +1,55 @@
 # pylint: disable=no-member
 import random
+from concurrent.futures import ProcessPoolExecutor
 
+import django
 from faker import Faker
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 
 
+from BlogApp.logic import bump_blog_listing_version
 from BlogApp.models import BlogPost, BlogCategory
+from BlogApp.search import get_search_backend
 from UsersApp.models import User
 from BaseApp.constants import COLORS
 
 
+def generate_post_texts(chunk):
+    """
+    Returns (title, intro, content) tuples for a chunk of posts.
+    chunk is a (count, seed) pair, module level so it can run in a process pool.
+    """
+    count, seed = chunk
+    fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed)
+    return [
+        (fake.sentence()[:64], fake.paragraph()[:128], fake.text())
+        for _ in range(count)
+    ]
+
+
 class Command(BaseCommand):
     help = 'Generates random blog posts'
 
     def add_arguments(self, parser):
         parser.add_argument('num_posts', type=int,
                             help='The number of blog posts to create')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Insert the posts with bulk_create in batches of this size')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes generating the fake text in bulk mode')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed for reproducible datasets')
 
     def handle(self, *args, **options):
         num_posts = options['num_posts']
+        seed = options['seed']
         fake = Faker()
+        if seed is not None:
+            random.seed(seed)
+            fake.seed_instance(seed)
 
         # Get all available categories
         categories = list(BlogCategory.objects.all())
@@ -35,6 +65,11 @@ class Command(BaseCommand):
                 'No authors found. Creating a Random Author...'))
             authors = [self.create_random_user(fake)]  # Create one random user
 
+        if options['batch_size']:
+            self.bulk_create_posts(num_posts, categories, authors,
+                                   options['batch_size'], options['workers'], seed)
+            return
+
         for _ in range(num_posts):
             title = fake.sentence()[:64]  # Limit title to 64 characters
             intro = fake.paragraph()[:128]  # Limit intro to 128 characters
@@ -56,6 +91,62 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(
             f'Successfully created {num_posts} blog posts'))
 
+    def bulk_create_posts(self, num_posts, categories, authors, batch_size, workers, seed):
+        """
+        Creates the posts with bulk_create, one transaction per batch.
+        bulk_create skips BlogPost.save and the post_save signals, so the
+        lengths are computed here and each batch is added to the search index.
+        """
+        rng = random.Random(seed)
+        chunks = [
+            (min(batch_size, num_posts - start),
+             None if seed is None else seed + start)
+            for start in range(0, num_posts, batch_size)
+        ]
+        search_backend = get_search_backend()
+        # without returned ids (e.g. MySQL) the index is rebuilt at the end
+        returns_ids = connection.features.can_return_rows_from_bulk_insert
+        created = 0
+        # spawned workers (Windows, macOS) start without Django, forked ones already have it
+        executor = (ProcessPoolExecutor(workers, initializer=django.setup)
+                    if workers > 1 else None)
+        try:
+            texts_per_chunk = (executor.map(generate_post_texts, chunks)
+                               if executor else map(generate_post_texts, chunks))
+            for texts in texts_per_chunk:
+                posts = [
+                    BlogPost(
+                        title=title,
+                        intro=intro,
+                        content=content,
+                        category=rng.choice(categories),
+                        author=rng.choice(authors),
+                        color=rng.choice(COLORS),
+                        title_length=len(title),
+                        intro_length=len(intro),
+                    )
+                    for title, intro, content in texts
+                ]
+                with transaction.atomic():
+                    posts = BlogPost.objects.bulk_create(posts)
+                    if returns_ids:
+                        search_backend.index_posts([post.pk for post in posts])
+                created += len(posts)
+                self.stdout.write(f'Created {created}/{num_posts} blog posts')
+        finally:
+            if executor:
+                executor.shutdown()
+
+        if not returns_ids:
+            with transaction.atomic():
+                search_backend.rebuild()
+        # bulk_create sends no signals. The listing version is in the database, so bumping
+        # it here reaches the running server; its cached search results are per process
+        # and pick up the new posts once they expire (SearchResultCache.ttl)
+        bump_blog_listing_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully created {num_posts} blog posts'))
+
     def create_random_categories(self, num_categories=5):
         """Creates random blog categories using Faker."""
         fake = Faker()
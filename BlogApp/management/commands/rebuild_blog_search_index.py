@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from BlogApp.logic import invalidate_search_results
+from BlogApp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for all blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='The database whose index should be rebuilt')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        with transaction.atomic(using=options['database']):
+            indexed_count = backend.rebuild()
+        invalidate_search_results()
+        if not backend.is_available():
+            self.stdout.write(self.style.WARNING(
+                f'No full-text index for the {backend.connection.vendor} backend, search uses icontains lookups'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully indexed {indexed_count} blog posts'))
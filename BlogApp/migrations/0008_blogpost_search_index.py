@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from BlogApp.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection.alias)
+    if backend.create_schema():
+        backend.rebuild()
+
+
+def drop_search_index(apps, schema_editor):
+    from BlogApp.search import get_search_backend
+
+    get_search_backend(schema_editor.connection.alias).drop_schema()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApp', '0007_alter_blogpost_intro_alter_blogpost_title'),
+        ('UsersApp', '0002_profile_created_at_profile_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
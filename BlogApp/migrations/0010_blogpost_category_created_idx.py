@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 00:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApp', '0009_blogpost_created_at_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='blogpost_category_created_idx'),
+        ),
+    ]
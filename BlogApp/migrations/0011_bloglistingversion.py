@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    BlogListingVersion = apps.get_model('BlogApp', 'BlogListingVersion')
+    BlogListingVersion.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BlogApp', '0010_blogpost_category_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogListingVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
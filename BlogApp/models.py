@@ -32,6 +32,15 @@ class BlogPost(models.Model):
     title_length = models.IntegerField(default=0)  # controls font size
     intro_length = models.IntegerField(default=0)  # controls font size
 
+    class Meta:
+        indexes = [
+            # serves the keyset pagination of the blog post list
+            models.Index(fields=['-created_at', '-id'],
+                         name='blogpost_created_at_id_idx'),
+            models.Index(fields=['category', '-created_at', '-id'],
+                         name='blogpost_category_created_idx'),
+        ]
+
     def __str__(self):
         return str(self.title)
 
@@ -39,3 +48,15 @@ class BlogPost(models.Model):
         self.title_length = len(self.title)
         self.intro_length = len(self.intro)
         super().save(*args, **kwargs)
+
+
+class BlogListingVersion(models.Model):
+    """
+    A single row counting the changes to what the blog listing shows, see
+    BlogApp.logic.get_blog_listing_version. It is kept in the database so
+    every worker and management command sees the same version.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,371 @@
+"""
+Full-text search index for blog posts.
+
+SQLite databases keep an FTS5 virtual table next to the blog post table,
+PostgreSQL keeps a weighted tsvector table behind a GIN index. Any other
+database, or a SQLite build without FTS5, falls back to icontains lookups.
+The index is kept in sync by BlogApp.signals and can be rebuilt with
+`manage.py rebuild_blog_search_index`.
+"""
+import re
+import unicodedata
+
+from django.contrib.auth import get_user_model
+from django.db import connections, models, DEFAULT_DB_ALIAS
+from django.db.utils import DatabaseError
+
+from BaseApp.utils import get_module_logger
+
+logger = get_module_logger("search", __file__)
+
+SEARCH_TABLE = "blogapp_blogpost_search"
+# upper bound of ranked ids returned for a single query
+SEARCH_RESULT_LIMIT = 500
+# the order matters, it maps to the FTS5 columns and the tsvector weights
+SEARCH_FIELDS = ("title", "intro", "author", "content")
+# letters and digits, FTS5's unicode61 and PostgreSQL's parser both split on "_"
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# keeps the number of sql parameters well below SQLite's limit
+INDEX_BATCH_SIZE = 500
+
+
+def normalize_search_text(text: str, tokenizer=None) -> str:
+    """
+    Collapses the text into space separated word tokens (see tokenize).
+    """
+    return " ".join((tokenizer or tokenize)(text))
+
+
+def tokenize(text: str) -> list:
+    """
+    Splits the text into lowercase word tokens, dropping punctuation.
+    """
+    return TOKEN_PATTERN.findall(str(text).casefold())
+
+
+def remove_diacritics(text: str) -> str:
+    """
+    Drops the diacritics of Latin letters (é -> e), like unicode61's remove_diacritics.
+    """
+    characters = []
+    for character in text:
+        decomposed = unicodedata.normalize("NFD", character)
+        if len(decomposed) > 1 and unicodedata.name(decomposed[0], "").startswith("LATIN"):
+            character = "".join(part for part in decomposed if not unicodedata.combining(part))
+        characters.append(character)
+    return "".join(characters)
+
+
+def tokenize_unicode61(text: str) -> list:
+    """
+    Splits the text into tokens the way FTS5's unicode61 tokenizer does:
+    lowercase, without diacritics, separated by anything but letters and digits.
+    """
+    return TOKEN_PATTERN.findall(remove_diacritics(str(text).lower()))
+
+
+def selected_fields(title=True, intro=True, author=True, content=False) -> tuple:
+    """
+    Returns the SEARCH_FIELDS enabled by the given flags, in index order.
+    """
+    flags = {"title": title, "intro": intro,
+             "author": author, "content": content}
+    return tuple(field for field in SEARCH_FIELDS if flags[field])
+
+
+def _batches(post_ids):
+    post_ids = list(post_ids)
+    for start in range(0, len(post_ids), INDEX_BATCH_SIZE):
+        yield post_ids[start:start + INDEX_BATCH_SIZE]
+
+
+class FallbackSearchBackend:
+    """
+    Search without an index, using the icontains lookups of the original
+    search_blog_posts implementation.
+    Backends with a real index override every method of this class.
+    """
+    vendor = None
+
+    def __init__(self, alias: str = DEFAULT_DB_ALIAS):
+        self.alias = alias
+        self._available = None
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def is_available(self) -> bool:
+        """Returns True if a full-text index can be used for this database."""
+        return False
+
+    def tokenize(self, text: str) -> list:
+        """Splits text into the tokens the index stores, so cached results can be refined."""
+        return tokenize(text)
+
+    def create_schema(self):
+        """Creates the index storage, returns True if the index can be used."""
+        return False
+
+    def drop_schema(self):
+        pass
+
+    def search_ids(self, search_query: str, fields: tuple, limit: int = SEARCH_RESULT_LIMIT) -> list:
+        from .models import BlogPost
+
+        lookups = {
+            "title": "title__icontains",
+            "intro": "intro__icontains",
+            "author": "author__username__icontains",
+            "content": "content__icontains",
+        }
+        query = models.Q()
+        for field in fields:
+            query |= models.Q(**{lookups[field]: search_query})
+        if not query:
+            return []
+        return list(
+            BlogPost.objects.using(self.alias).filter(query)
+            .order_by("-created_at", "-id")
+            .values_list("pk", flat=True)[:limit]
+        )
+
+    def index_posts(self, post_ids):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self) -> int:
+        return 0
+
+    def _source_tables(self):
+        """
+        Returns the quoted blog post and user tables the index is built from.
+        """
+        from .models import BlogPost
+
+        quote = self.connection.ops.quote_name
+        return (quote(BlogPost._meta.db_table),
+                quote(get_user_model()._meta.db_table))
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    """
+    FTS5 index storing a copy of the searchable text, one row per post
+    using the post id as the rowid.
+    Results are ranked with bm25, weighting title > intro > author > content.
+    """
+    vendor = "sqlite"
+    weights = (10.0, 5.0, 2.0, 1.0)
+
+    def tokenize(self, text):
+        return tokenize_unicode61(text)
+
+    def is_available(self) -> bool:
+        if self._available is None:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [SEARCH_TABLE])
+                self._available = cursor.fetchone() is not None
+        return self._available
+
+    def create_schema(self):
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+                    f"USING fts5({', '.join(SEARCH_FIELDS)}, tokenize = 'unicode61')")
+        except DatabaseError as e:
+            # SQLite was compiled without FTS5
+            logger.warning(f"FTS5 is not available, search falls back to icontains: {e}")
+            self._available = False
+            return False
+        self._available = True
+        return True
+
+    def drop_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+        self._available = False
+
+    def match_expression(self, search_query: str, fields: tuple) -> str:
+        """
+        Builds an FTS5 query where every token is a prefix match and
+        all tokens must be found in one of the selected columns.
+        """
+        terms = " AND ".join(f'"{token}"*' for token in self.tokenize(search_query))
+        if not terms or not fields:
+            return ""
+        return f"{{{' '.join(fields)}}} : ({terms})"
+
+    def search_ids(self, search_query, fields, limit=SEARCH_RESULT_LIMIT):
+        if not self.is_available():
+            return super().search_ids(search_query, fields, limit)
+        match = self.match_expression(search_query, fields)
+        if not match:
+            return []
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                f"ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s",
+                [match, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    def _insert_sql(self, where: str = "") -> str:
+        post_table, user_table = self._source_tables()
+        return (
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+            f"SELECT post.id, post.title, COALESCE(post.intro, ''), author.username, post.content "
+            f"FROM {post_table} post INNER JOIN {user_table} author ON author.id = post.author_id "
+            f"{where}"
+        )
+
+    def index_posts(self, post_ids):
+        if not self.is_available():
+            return
+        with self.connection.cursor() as cursor:
+            for batch in _batches(post_ids):
+                placeholders = ", ".join(["%s"] * len(batch))
+                cursor.execute(
+                    f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", batch)
+                cursor.execute(
+                    self._insert_sql(f"WHERE post.id IN ({placeholders})"), batch)
+
+    def remove_posts(self, post_ids):
+        if not self.is_available():
+            return
+        with self.connection.cursor() as cursor:
+            for batch in _batches(post_ids):
+                placeholders = ", ".join(["%s"] * len(batch))
+                cursor.execute(
+                    f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", batch)
+
+    def rebuild(self):
+        if not self.is_available() and not self.create_schema():
+            return 0
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(self._insert_sql())
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+            return cursor.fetchone()[0]
+
+
+class PostgresSearchBackend(FallbackSearchBackend):
+    """
+    tsvector index with one row per post and a GIN index on the document.
+    Fields are stored with the weights A (title), B (intro), C (author)
+    and D (content) so a query can be restricted to a subset of them
+    without losing the index. Results are ranked with ts_rank.
+    """
+    vendor = "postgresql"
+    field_weights = dict(zip(SEARCH_FIELDS, "ABCD"))
+
+    def is_available(self):
+        if self._available is None:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [SEARCH_TABLE])
+                self._available = cursor.fetchone()[0]
+        return self._available
+
+    def create_schema(self):
+        post_table, _ = self._source_tables()
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                f"post_id bigint PRIMARY KEY REFERENCES {post_table} (id) "
+                f"ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                f"document tsvector NOT NULL)")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx "
+                f"ON {SEARCH_TABLE} USING GIN (document)")
+        self._available = True
+        return True
+
+    def drop_schema(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+        self._available = False
+
+    def tsquery(self, search_query: str, fields: tuple) -> str:
+        """
+        Builds a to_tsquery string where every token is a prefix match
+        restricted to the weights of the selected fields.
+        """
+        weights = "".join(self.field_weights[field] for field in fields)
+        if not weights:
+            return ""
+        return " & ".join(f"{token}:*{weights}" for token in self.tokenize(search_query))
+
+    def search_ids(self, search_query, fields, limit=SEARCH_RESULT_LIMIT):
+        if not self.is_available():
+            return super().search_ids(search_query, fields, limit)
+        tsquery = self.tsquery(search_query, fields)
+        if not tsquery:
+            return []
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT post_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query "
+                f"WHERE document @@ query "
+                f"ORDER BY ts_rank(document, query) DESC, post_id DESC LIMIT %s",
+                [tsquery, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    def _upsert_sql(self, where: str = "") -> str:
+        post_table, user_table = self._source_tables()
+        return (
+            f"INSERT INTO {SEARCH_TABLE} (post_id, document) "
+            f"SELECT post.id, "
+            f"setweight(to_tsvector('simple', post.title), 'A') || "
+            f"setweight(to_tsvector('simple', COALESCE(post.intro, '')), 'B') || "
+            f"setweight(to_tsvector('simple', author.username), 'C') || "
+            f"setweight(to_tsvector('simple', post.content), 'D') "
+            f"FROM {post_table} post INNER JOIN {user_table} author ON author.id = post.author_id "
+            f"{where} "
+            f"ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+
+    def index_posts(self, post_ids):
+        if not self.is_available():
+            return
+        with self.connection.cursor() as cursor:
+            for batch in _batches(post_ids):
+                cursor.execute(self._upsert_sql("WHERE post.id = ANY(%s)"), [batch])
+
+    def remove_posts(self, post_ids):
+        if not self.is_available():
+            return
+        with self.connection.cursor() as cursor:
+            for batch in _batches(post_ids):
+                cursor.execute(
+                    f"DELETE FROM {SEARCH_TABLE} WHERE post_id = ANY(%s)", [batch])
+
+    def rebuild(self):
+        if not self.is_available():
+            self.create_schema()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {SEARCH_TABLE}")
+            cursor.execute(self._upsert_sql())
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+            return cursor.fetchone()[0]
+
+
+SEARCH_BACKENDS = {
+    backend.vendor: backend for backend in (SQLiteSearchBackend, PostgresSearchBackend)
+}
+_backends = {}
+
+
+def get_search_backend(alias: str = DEFAULT_DB_ALIAS) -> FallbackSearchBackend:
+    """
+    Returns the search backend for the given database alias, created once per process.
+    """
+    if alias not in _backends:
+        vendor = connections[alias].vendor
+        _backends[alias] = SEARCH_BACKENDS.get(
+            vendor, FallbackSearchBackend)(alias)
+    return _backends[alias]
@@ -1,9 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from BaseApp.utils import get_module_logger
 
-from .models import BlogCategory
+from .logic import invalidate_blog_listing
+from .models import BlogCategory, BlogPost
+from .search import get_search_backend
 
 logger = get_module_logger("signals", __file__)
 
@@ -12,3 +14,38 @@ logger = get_module_logger("signals", __file__)
 def print_category_name(sender, instance, created, **kwargs):
     if created:
         logger.success(f"Category created: {instance.name}")
+
+
+@receiver(post_save, sender=BlogCategory)
+def invalidate_category_listing(sender, instance, created, **kwargs):
+    """Listings show the category name, the cards re-render on their own."""
+    if not created:
+        invalidate_blog_listing()
+
+
+@receiver(post_save, sender=BlogPost)
+def index_blog_post(sender, instance, using, **kwargs):
+    """Keeps the full-text search index and the caches in sync with the saved post."""
+    get_search_backend(using).index_posts([instance.pk])
+    invalidate_blog_listing()
+
+
+@receiver(post_delete, sender=BlogPost)
+def remove_blog_post_from_index(sender, instance, using, **kwargs):
+    get_search_backend(using).remove_posts([instance.pk])
+    invalidate_blog_listing()
+
+
+@receiver(post_save, sender='UsersApp.User')
+def reindex_author_posts(sender, instance, created, using, update_fields=None, **kwargs):
+    """
+    The index and the listings show the author's username, re-index their posts
+    and drop the cached listings when it may have changed.
+    Saves that only touch other fields (e.g. last_login) are skipped.
+    """
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    post_ids = list(BlogPost.objects.using(using).filter(
+        author=instance).values_list('pk', flat=True))
+    get_search_backend(using).index_posts(post_ids)
+    invalidate_blog_listing()
@@ -1,3 +1,492 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils.html import escape
+
+from BaseApp.pagination import InvalidCursorError, encode_cursor
+from UsersApp.models import User
+
+from .logic import (
+    SearchResultCache, blog_card_cache, blog_card_rows, get_blog_listing_version, get_blog_post_page,
+    invalidate_search_results, render_blog_cards, search_blog_post_ids, search_blog_posts
+)
+from .models import BlogCategory, BlogListingVersion, BlogPost
+from .search import get_search_backend
+
+
+class BlogTestCase(TestCase):
+    """
+    Creates an author and a category shared by the blog tests
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='blogauthor', email='blogauthor@example.com', password='password123')
+        cls.category = BlogCategory.objects.create(name='Web Development')
+
+    def setUp(self):
+        # rolled back posts don't send signals, start from an empty search cache
+        invalidate_search_results()
+
+    @classmethod
+    def create_post(cls, title, intro='An intro', content='Some content', **kwargs):
+        return BlogPost.objects.create(
+            title=title, intro=intro, content=content,
+            author=kwargs.pop('author', cls.author),
+            category=kwargs.pop('category', cls.category), **kwargs)
+
+
+class SearchBlogPostsTests(BlogTestCase):
+    """
+    Test the full-text search behind BlogApp.logic.search_blog_posts
+    """
+
+    def test_sqlite_uses_full_text_index(self):
+        """The test database is SQLite, the FTS5 index should be available"""
+        self.assertTrue(get_search_backend().is_available())
+
+    def test_prefix_search_matches_title(self):
+        """Test that a partial word typed into the search box matches the title"""
+        post = self.create_post('Django templates')
+        self.create_post('Tailwind utilities')
+        self.assertEqual(search_blog_post_ids('djan'), [post.pk])
+
+    def test_all_terms_must_match(self):
+        """Test that every word of the query has to match"""
+        post = self.create_post('Django templates')
+        self.create_post('Django models')
+        self.assertEqual(search_blog_post_ids('django temp'), [post.pk])
+
+    def test_title_ranks_above_intro(self):
+        """Test that a title match is ranked above an intro match"""
+        intro_match = self.create_post('Frontend notes', intro='Using htmx with Django')
+        title_match = self.create_post('Htmx in practice')
+        self.assertEqual(search_blog_post_ids('htmx'), [title_match.pk, intro_match.pk])
+
+    def test_content_only_searched_when_requested(self):
+        """Test that content is excluded unless content=True"""
+        post = self.create_post('A post', content='Loguru makes logging simple')
+        self.assertEqual(search_blog_post_ids('loguru'), [])
+        self.assertEqual(search_blog_post_ids('loguru', content=True), [post.pk])
+
+    def test_search_by_author_username(self):
+        """Test that posts can be found by their author's username"""
+        post = self.create_post('A post')
+        self.assertEqual(search_blog_post_ids('blogauth'), [post.pk])
+
+    def test_punctuation_only_query_returns_nothing(self):
+        """Test that a query without words does not reach the index"""
+        self.create_post('A post')
+        self.assertEqual(search_blog_post_ids('"*:()'), [])
+
+    def test_search_blog_posts_returns_ranked_queryset(self):
+        """Test that search_blog_posts keeps the ranking of the index"""
+        intro_match = self.create_post('Frontend notes', intro='Using htmx with Django')
+        title_match = self.create_post('Htmx in practice')
+        self.assertEqual(list(search_blog_posts('htmx')), [title_match, intro_match])
+        self.assertFalse(search_blog_posts('nothing').exists())
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that saving and deleting a post keeps the index in sync"""
+        post = self.create_post('Django templates')
+        post.title = 'Flask templates'
+        post.save()
+        self.assertEqual(search_blog_post_ids('django'), [])
+        self.assertEqual(search_blog_post_ids('flask'), [post.pk])
+        post.delete()
+        self.assertEqual(search_blog_post_ids('flask'), [])
+
+    def test_index_follows_author_rename(self):
+        """Test that renaming an author re-indexes their posts"""
+        post = self.create_post('A post')
+        self.author.username = 'renamedauthor'
+        self.author.save()
+        self.assertEqual(search_blog_post_ids('blogauthor'), [])
+        self.assertEqual(search_blog_post_ids('renamed'), [post.pk])
+
+    def test_rebuild_command(self):
+        """Test that the rebuild command restores an emptied index"""
+        post = self.create_post('Django templates')
+        get_search_backend().remove_posts([post.pk])
+        self.assertEqual(search_blog_post_ids('django'), [])
+        call_command('rebuild_blog_search_index', stdout=StringIO())
+        self.assertEqual(search_blog_post_ids('django'), [post.pk])
+
+
+class BlogPostPaginationTests(BlogTestCase):
+    """
+    Test the cursor pagination of the blog post list
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.posts = [self.create_post(f'Post {i}') for i in range(7)]
+        # ties on created_at must be broken by id
+        BlogPost.objects.filter(pk__in=[p.pk for p in self.posts[2:5]]).update(
+            created_at=self.posts[2].created_at)
+
+    def collect_pages(self, search_query='', page_size=3):
+        pages, cursor = [], None
+        while True:
+            page = get_blog_post_page(search_query, cursor, page_size)
+            pages.append([post.id for post in page])
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_pages_cover_all_posts_newest_first(self):
+        """Test that following the cursors returns every post once, newest first"""
+        expected = list(BlogPost.objects.order_by(
+            '-created_at', '-id').values_list('pk', flat=True))
+        pages = self.collect_pages()
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_page_is_a_single_query(self):
+        """Test that a page costs one query, without COUNT(*)"""
+        first_page = get_blog_post_page(page_size=3)
+        with self.assertNumQueries(1):
+            get_blog_post_page(cursor=first_page.next_cursor, page_size=3)
+
+    def test_search_results_are_paged(self):
+        """Test that search results are paged in ranked order"""
+        pages = self.collect_pages('post')
+        self.assertEqual(sum(pages, []), search_blog_post_ids('post'))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+    def test_invalid_cursor_raises(self):
+        """Test that tampered cursors are rejected"""
+        with self.assertRaises(InvalidCursorError):
+            get_blog_post_page(cursor='not-a-cursor')
+        with self.assertRaises(InvalidCursorError):
+            get_blog_post_page('post', cursor=encode_cursor(['2024-01-01', 1]))
+        for values in ([['2024-01-01'], 1], [{'a': 1}, {}]):
+            with self.subTest(values=values), self.assertRaises(InvalidCursorError):
+                get_blog_post_page(cursor=encode_cursor(values))
+
+    def test_list_endpoint_renders_next_cursor(self):
+        """Test that the infinite scroll sentinel carries the next cursor"""
+        self.create_post('Post 8')
+        self.create_post('Post 9')
+        response = self.client.post(reverse('BlogApp:blog-post-list'))
+        page = get_blog_post_page()
+        self.assertTrue(page.has_next)
+        self.assertContains(response, escape(json.dumps({'cursor': page.next_cursor})))
+
+    def test_list_endpoint_is_a_single_query(self):
+        """Test that rendering a page of uncached cards costs one query"""
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('BlogApp:blog-post-list'))
+        self.assertContains(response, self.author.username, count=7)
+        self.assertContains(response, self.category.name, count=7)
+
+    def test_search_page_queries(self):
+        """
+        Test that a page of search results costs the listing version, the index lookup,
+        the words of the small result kept for refining longer queries, and one query
+        for the cards
+        """
+        cache.clear()
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                reverse('BlogApp:blog-post-list'), {'search_query': 'post'})
+        self.assertContains(response, self.author.username, count=7)
+
+    def test_rows_do_not_load_the_content(self):
+        row = blog_card_rows(BlogPost.objects.all()).first()
+        self.assertNotIn('content', row._fields)
+        self.assertEqual(row.author_username, self.author.username)
+
+    def test_list_endpoint_rejects_invalid_cursor(self):
+        response = self.client.post(
+            reverse('BlogApp:blog-post-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_endpoint_still_accepts_page_numbers(self):
+        self.create_post('Post 8')
+        self.create_post('Post 9')
+        response = self.client.post(reverse('BlogApp:blog-post-list'), {'page': 1})
+        self.assertContains(response, escape(json.dumps({'page': 2})))
+
+
+class BlogCardCacheTests(BlogTestCase):
+    """
+    Test the per-post fragment cache of the rendered blog cards
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        blog_card_cache.stats.reset()
+        self.post = self.create_post('Cached post')
+
+    def rows(self):
+        return list(blog_card_rows(BlogPost.objects.filter(pk=self.post.pk)))
+
+    def render(self):
+        return render_blog_cards(self.rows())[0]
+
+    def test_cached_card_does_not_touch_the_database(self):
+        """Test that a cached card is returned without rendering"""
+        first = self.render()
+        posts = self.rows()
+        with self.assertNumQueries(0):
+            cached = render_blog_cards(posts)[0]
+        self.assertEqual(first, cached)
+        stats = blog_card_cache.stats.snapshot()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_saving_the_post_renders_a_new_card(self):
+        self.render()
+        self.post.title = 'Edited post'
+        self.post.save()
+        self.assertIn('Edited post', self.render())
+
+    def test_renaming_the_category_invalidates_the_card(self):
+        self.render()
+        self.category.name = 'Renamed Category'
+        self.category.save()
+        self.assertIn('Renamed Category', self.render())
+
+    def test_renaming_the_author_invalidates_the_card(self):
+        self.render()
+        self.author.username = 'renamedauthor'
+        self.author.save()
+        self.assertIn('renamedauthor', self.render())
+
+    def test_renames_without_signals_render_a_new_card(self):
+        """Test that the card version covers the names, e.g. for renames in another process"""
+        self.render()
+        BlogCategory.objects.filter(pk=self.category.pk).update(name='Quietly Renamed')
+        User.objects.filter(pk=self.author.pk).update(username='quietlyrenamed')
+        card = self.render()
+        self.assertIn('Quietly Renamed', card)
+        self.assertIn('quietlyrenamed', card)
+
+
+class SearchResultCacheTests(BlogTestCase):
+    """
+    Test the prefix aware cache of search results
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.django_post = self.create_post('Django templates')
+        self.djangonaut_post = self.create_post('Djangonaut notes', intro='Django tips')
+        self.flask_post = self.create_post('Flask templates', intro='Not the other one')
+        self.backend = get_search_backend()
+
+    def test_repeated_query_is_served_from_cache(self):
+        ids = search_blog_post_ids('templates')
+        # the listing version only
+        with self.assertNumQueries(1):
+            self.assertEqual(search_blog_post_ids(' Templates!'), ids)
+
+    def test_longer_query_is_refined_in_memory(self):
+        """Test that typing on after a cached prefix doesn't query the index"""
+        search_blog_post_ids('dj')
+        # the listing version of each search
+        with self.assertNumQueries(2):
+            djangon = search_blog_post_ids('djangon')
+            django_templates = search_blog_post_ids('django temp')
+        self.assertEqual(djangon, [self.djangonaut_post.pk])
+        self.assertEqual(django_templates, [self.django_post.pk])
+
+    def test_refined_results_match_the_index(self):
+        search_blog_post_ids('d')
+        for query in ['dj', 'djangonaut', 'django tip', 'django flask']:
+            with self.subTest(query=query):
+                self.assertCountEqual(
+                    search_blog_post_ids(query),
+                    self.backend.search_ids(query, ('title', 'intro', 'author')))
+
+    def test_refinement_tokenizes_like_the_index(self):
+        """Test that diacritics and underscores are handled as the FTS5 index does"""
+        cafe_post = self.create_post('Café_culture')
+        search_blog_post_ids('caf')
+        for query in ['cafe', 'café', 'cafe cult']:
+            with self.subTest(query=query):
+                self.assertEqual(search_blog_post_ids(query), [cafe_post.pk])
+                self.assertEqual(self.backend.search_ids(query, ('title', 'intro', 'author')),
+                                 [cafe_post.pk])
+
+    def test_large_prefix_results_are_not_refined(self):
+        result_cache = SearchResultCache(refine_limit=1)
+        fields = ('title', 'intro', 'author')
+        result_cache.search('dj', fields, 500, self.backend)
+        with self.assertNumQueries(1):
+            result_cache.search('dja', fields, 500, self.backend)
+
+    def test_entries_are_bounded(self):
+        result_cache = SearchResultCache(max_entries=2, refine_limit=0)
+        fields = ('title',)
+        for query in ['flask', 'django', 'templates']:
+            result_cache.search(query, fields, 500, self.backend)
+        with self.assertNumQueries(1):
+            result_cache.search('flask', fields, 500, self.backend)
+
+    def test_entries_expire(self):
+        result_cache = SearchResultCache(ttl=0, refine_limit=0)
+        result_cache.search('flask', ('title',), 500, self.backend)
+        with self.assertNumQueries(1):
+            result_cache.search('flask', ('title',), 500, self.backend)
+
+    def test_saving_a_post_clears_the_cache(self):
+        search_blog_post_ids('flask')
+        new_post = self.create_post('Flask tips')
+        self.assertIn(new_post.pk, search_blog_post_ids('flask'))
+
+
+class BlogPostsGetEndpointTests(BlogTestCase):
+    """
+    Test the cacheable GET variant of the blog post list
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.post = self.create_post('Django templates')
+        self.url = reverse('BlogApp:blog-posts')
+
+    def test_response_is_cacheable(self):
+        response = self.client.get(self.url, {'search_query': 'django'})
+        self.assertContains(response, 'Django templates')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age', response['Cache-Control'])
+        self.assertIn('HX-Request', response['Vary'])
+
+    def test_unchanged_listing_is_not_modified(self):
+        """Test that revalidating an unchanged listing only reads the listing version"""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_shared_listing_is_served_from_cache(self):
+        """Test that another client asking for the same page only reads the listing version"""
+        first = self.client.get(self.url, {'search_query': 'django'})
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, {'search_query': 'django'})
+        self.assertEqual(first.content, second.content)
+
+    def test_etag_changes_with_posts_and_parameters(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotEqual(etag, self.client.get(self.url, {'search_query': 'x'})['ETag'])
+        self.post.title = 'Flask templates'
+        self.post.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Flask templates')
+
+    def test_version_is_shared_through_the_database(self):
+        """Test that a bump made elsewhere (another worker, a command) changes the ETag"""
+        etag = self.client.get(self.url)['ETag']
+        BlogListingVersion.objects.update(version=F('version') + 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_search_results_of_another_process_are_not_served(self):
+        """Test that a bump made by another process makes this one search again"""
+        etag = self.client.get(self.url, {'search_query': 'flask'})['ETag']
+        # the post is saved by another process: this process keeps its cached results
+        with mock.patch('BlogApp.logic.invalidate_search_results'):
+            self.create_post('Flask tips')
+        response = self.client.get(self.url, {'search_query': 'flask'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Flask tips')
+
+    def test_category_filter(self):
+        other_category = BlogCategory.objects.create(name='Other')
+        other_post = self.create_post('Other post', category=other_category)
+        for params in [{}, {'search_query': 'post'}]:
+            with self.subTest(params=params):
+                response = self.client.get(
+                    self.url, {'category': other_category.pk, **params})
+                self.assertContains(response, other_post.title)
+                self.assertNotContains(response, self.post.title)
+
+    def test_invalid_parameters(self):
+        for params in [{'category': 'abc'}, {'cursor': 'not-a-cursor'}, {'page': 'abc'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_post_is_not_allowed(self):
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class BlogViewTests(BlogTestCase):
+    """
+    Test that the blog page renders the first page of posts inline
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('BlogApp:blog')
+
+    def test_first_page_is_rendered_inline(self):
+        post = self.create_post('Inline post')
+        response = self.client.get(self.url)
+        self.assertContains(response, escape(post.title))
+        # no follow-up request for the first page
+        self.assertNotContains(response, 'hx-trigger="load"')
+
+    def test_infinite_scroll_continues_after_first_page(self):
+        for number in range(10):
+            self.create_post(f'Post {number}')
+        content = self.client.get(self.url).content.decode()
+        self.assertIn('hx-trigger="intersect once"', content)
+        self.assertIn('Post 9', content)
+        self.assertNotIn('Post 0', content)
+
+    def test_first_page_is_shared_with_the_listing_endpoint(self):
+        """Test that the inline page and the GET listing use the same cached render"""
+        self.create_post('Shared post')
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('BlogApp:blog-posts'))
+        self.assertContains(response, 'Shared post')
+
+
+class GenerateBlogPostsCommandTests(BlogTestCase):
+    """
+    Test the bulk mode of the generate_blog_posts command
+    """
+
+    def generate(self, *args):
+        call_command('generate_blog_posts', *args, stdout=StringIO())
+        return list(BlogPost.objects.order_by('id').values_list(
+            'title', 'intro', 'content', 'title_length', 'intro_length'))
+
+    def test_bulk_mode_computes_lengths(self):
+        posts = self.generate('25', '--batch-size', '10', '--seed', '1')
+        self.assertEqual(len(posts), 25)
+        for title, intro, _, title_length, intro_length in posts:
+            self.assertEqual(title_length, len(title))
+            self.assertEqual(intro_length, len(intro))
+
+    def test_seed_makes_datasets_reproducible(self):
+        first = self.generate('12', '--batch-size', '5', '--seed', '42')
+        BlogPost.objects.all().delete()
+        second = self.generate('12', '--batch-size', '5', '--seed', '42')
+        self.assertEqual(first, second)
+
+    def test_bulk_created_posts_are_searchable(self):
+        self.generate('10', '--batch-size', '4', '--seed', '7')
+        post = BlogPost.objects.first()
+        word = post.title.split()[0]
+        self.assertIn(post.pk, search_blog_post_ids(word))
 
-# Create your tests here.
+    def test_bulk_mode_bumps_the_listing_version(self):
+        """Test that the running server sees new posts, bulk_create sends no signals"""
+        version = get_blog_listing_version()
+        self.generate('3', '--seed', '1')
+        self.assertNotEqual(get_blog_listing_version(), version)
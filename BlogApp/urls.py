@@ -1,9 +1,10 @@
 from django.urls import path
 
-from .views import BlogView, get_blog_post_list
+from .views import BlogView, get_blog_post_list, get_blog_posts
 
 urlpatterns = [
     path('', BlogView.as_view(), name="blog"),
     # #
     path('blog-post-list/', get_blog_post_list, name="blog-post-list"),
+    path('posts/', get_blog_posts, name="blog-posts"),
 ]
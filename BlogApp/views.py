@@ -1,11 +1,18 @@
-import time
+import hashlib
+import json
 
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.template import loader
-from django.http import HttpResponse, JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_http_methods
+from django.views.decorators.vary import vary_on_headers
 
 import BlogApp.logic as logic
+from BaseApp.pagination import InvalidCursorError
+from BaseApp.timing import record_cache
 from BaseApp.views import BasePage
 from BaseApp.utils import get_module_logger
 from core import settings
@@ -24,44 +31,157 @@ class BlogView(BasePage):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['blog_categories'] = BlogCategory.objects.all()
+        # THE FIRST PAGE IS RENDERED INLINE, THE INFINITE SCROLL LOADS THE REST
+        context['blog_post_list'] = mark_safe(get_cached_blog_post_list({}))
         return context
 
 
-@require_http_methods(['POST'])
-def get_blog_post_list(request):
-    page_size = 8
-    try:
-        # SETUP THE DATA
-        page_number = int(request.POST.get('page', 1))  # Default to page 1
-        search_query = request.POST.get('search_query', '')
-        # lOG THE DATA
-        module_logger.debug(f"{page_number=}, {search_query=}")
-        # CHECK IF THERE IS A SEARCH QUERY
-        if search_query:
-            blog_posts = logic.search_blog_posts(search_query)
-        else:
-            blog_posts = BlogPost.objects.all()
-        # SPLIT THE DATA INTO A PAGES
-        paginator = Paginator(blog_posts, page_size)
+BLOG_POSTS_PAGE_SIZE = 8
+# seconds browsers and proxies may reuse a GET listing before revalidating it
+BLOG_POSTS_MAX_AGE = 60
+
+
+def render_blog_post_list(params) -> str:
+    """
+    Renders a page of the blog post list for the given query parameters:
+        - cursor: the next_cursor of the previous page (or page, a page number)
+        - search_query: optional full-text search
+        - category: optional category id
+    Raises InvalidCursorError or ValueError for invalid parameters.
+    """
+    search_query = params.get('search_query', '')
+    category_id = int(params['category']) if params.get('category') else None
+    next_page_vals = {'category': category_id} if category_id is not None else {}
+    # PAGE NUMBERS ARE STILL ACCEPTED, THE INFINITE SCROLL SENDS CURSORS
+    if 'page' in params:
+        page_number = int(params.get('page') or 1)
+        module_logger.debug("page_number={!r}, search_query={!r}", page_number, search_query)
         # 0 MEANS NO MORE PAGES
         if page_number == 0:  # empy response
-            return HttpResponse('')
-        # GET THE PAGE
-        page_obj = paginator.get_page(page_number)
-        # RENDER THE TEMPLATE
-        template = loader.get_template('BlogApp/sections/blog_post_list.html')
-        context = {
-            'blog_posts': page_obj,
-            'has_next': page_obj.has_next(),
-        }
-        return HttpResponse(template.render(context, request))
-    except Exception as e:
-        module_logger.error(e)
-        print(f"Error in get_blog_post_list: {e}")
-        if settings.DEBUG:
-            return JsonResponse(
-                {'error': f'Error in get_blog_post_list:\n {e}'},
-                status=500)
+            return ''
+        page = get_blog_post_page_by_number(
+            search_query, page_number, category_id)
+        has_next = page.has_next()
+        if has_next:
+            next_page_vals['page'] = page.next_page_number()
+    else:
+        cursor = params.get('cursor') or None
+        module_logger.debug("cursor={!r}, search_query={!r}", cursor, search_query)
+        # GET THE PAGE, NO COUNT QUERY AND NO OFFSET
+        page = logic.get_blog_post_page(
+            search_query, cursor, BLOG_POSTS_PAGE_SIZE, category_id)
+        has_next = page.has_next
+        if has_next:
+            next_page_vals['cursor'] = page.next_cursor
+    # RENDER THE TEMPLATE
+    template = loader.get_template('BlogApp/sections/blog_post_list.html')
+    context = {
+        'blog_cards': logic.render_blog_cards(page),
+        'has_next': has_next,
+        'next_page_vals': json.dumps(next_page_vals),
+    }
+    return template.render(context)
+
+
+def get_blog_post_page_by_number(search_query, page_number, category_id=None):
+    """
+    Page number based listing, kept for clients that still send 'page'.
+    Every request runs a COUNT(*) and deep pages use OFFSET, prefer cursors.
+    """
+    # CHECK IF THERE IS A SEARCH QUERY
+    if search_query:
+        blog_posts = logic.search_blog_posts(search_query)
+    else:
+        blog_posts = BlogPost.objects.order_by(*logic.BLOG_POST_ORDERING)
+    if category_id is not None:
+        blog_posts = blog_posts.filter(category_id=category_id)
+    # SPLIT THE DATA INTO A PAGES
+    paginator = Paginator(logic.blog_card_rows(blog_posts), BLOG_POSTS_PAGE_SIZE)
+    return paginator.get_page(page_number)
+
+
+def handle_blog_post_list_error(e):
+    if isinstance(e, (InvalidCursorError, ValueError)):
+        module_logger.warning(e)
+        return HttpResponseBadRequest('Invalid blog post list parameters')
+    # called from the views' except blocks, the traceback is logged too
+    module_logger.exception("Error in get_blog_post_list: {}", e)
+    if settings.DEBUG:
         return JsonResponse(
-            {'error': 'Internal Server Error'},
+            {'error': f'Error in get_blog_post_list:\n {e}'},
             status=500)
+    return JsonResponse(
+        {'error': 'Internal Server Error'},
+        status=500)
+
+
+@require_http_methods(['POST'])
+def get_blog_post_list(request):
+    """
+    POST variant of the blog post list, prefer the cacheable get_blog_posts.
+    """
+    try:
+        return HttpResponse(render_blog_post_list(request.POST))
+    except Exception as e:
+        return handle_blog_post_list_error(e)
+
+
+def blog_post_list_key(params) -> str:
+    """
+    Key of a listing, made of the listing version and the query parameters.
+    Computing it costs one primary key lookup (see get_blog_listing_version).
+    """
+    request_key = '|'.join([
+        logic.get_blog_listing_version(),
+        params.get('cursor', ''),
+        params.get('page', ''),
+        params.get('search_query', '').strip(),
+        params.get('category', ''),
+    ])
+    return hashlib.sha256(request_key.encode()).hexdigest()
+
+
+def blog_posts_etag(request):
+    """
+    ETag of a GET listing, see blog_post_list_key.
+    The key is kept on the request so the view doesn't compute it again.
+    """
+    request.blog_post_list_key = blog_post_list_key(request.GET)
+    return request.blog_post_list_key
+
+
+def blog_post_list_cache_key(params, list_key=None) -> str:
+    return f"blog:posts:{list_key or blog_post_list_key(params)}"
+
+
+def get_cached_blog_post_list(params, list_key=None) -> str:
+    """
+    Returns render_blog_post_list(params), kept in the cache by listing key so
+    repeated scrolls, shared searches and blog page views skip rendering.
+    """
+    cache_key = blog_post_list_cache_key(params, list_key)
+    body = cache.get(cache_key)
+    record_cache(int(body is not None), int(body is None))
+    if body is None:
+        body = render_blog_post_list(params)
+        cache.set(cache_key, body, BLOG_POSTS_MAX_AGE)
+    return body
+
+
+@require_GET
+@vary_on_headers('HX-Request')
+@cache_control(public=True, max_age=BLOG_POSTS_MAX_AGE)
+@condition(etag_func=blog_posts_etag)
+def get_blog_posts(request):
+    """
+    Cacheable GET listing of blog posts, takes the parameters of render_blog_post_list.
+    Clients revalidate with If-None-Match and get a 304 while the listing is unchanged.
+    Rendered pages are also kept in the cache (see get_cached_blog_post_list),
+    so repeated scrolls and shared searches from other clients only read the
+    listing version.
+    """
+    try:
+        return HttpResponse(get_cached_blog_post_list(
+            request.GET, getattr(request, 'blog_post_list_key', None)))
+    except Exception as e:
+        return handle_blog_post_list_error(e)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FlashcardappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'FlashCardApp'
+
+    def ready(self):
+        import FlashCardApp.signals
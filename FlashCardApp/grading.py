@@ -0,0 +1,173 @@
+"""
+Grading of card answers from a per deck answer key.
+
+Grading used to load the card and then its question for every submit.
+The answer key of a deck maps each card id to what grading needs, loaded
+in one query and kept per process. Each deck row has an answer key
+version, replaced when one of its cards or questions is saved or deleted
+(see FlashCardApp.signals). A process trusts the version it last read for
+ANSWER_KEY_VERSION_TTL seconds, so most submits run no query at all, and
+then reads it again with one primary key lookup. The version is in the
+database, so every worker sees a change within ANSWER_KEY_VERSION_TTL
+seconds; the process making it drops its copy of the key right away.
+
+Quiz sessions grade a whole batch at once with grade_batch.
+
+Example usage:
+    key = answer_keys.lookup(deck_id, card_id)
+    correct, result = grade(key, request.POST['answer'])
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from .models import Card, Deck, Question
+
+# allowed difference for NUMERIC answers, covers floating-point discrepancies
+NUMERIC_TOLERANCE = 0.01
+# decks whose answer key a process keeps, least recently used ones are dropped
+ANSWER_KEY_MAX_DECKS = 256
+# seconds a process grades from a deck's key before checking its version again
+ANSWER_KEY_VERSION_TTL = 5.0
+
+
+class AnswerKey:
+    """
+    What grading a card needs: the question type, the answer as shown to the
+    user, the answer as compared and, for NUMERIC questions, its value.
+    """
+    __slots__ = ('type', 'answer', 'normalized', 'value', 'tolerance')
+
+    def __init__(self, question_type: str, answer: str):
+        self.type = question_type
+        self.answer = answer
+        self.normalized = normalize(question_type, answer)
+        self.value = None
+        self.tolerance = NUMERIC_TOLERANCE
+        if question_type == Question.QuestionType.NUMERIC:
+            try:
+                self.value = float(answer)
+            except (TypeError, ValueError):
+                pass
+
+
+def parse_number(answer: str):
+    try:
+        return float(answer)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize(question_type: str, answer: str) -> str:
+    """
+    FREE_TEXT answers are compared case-insensitively, others as they are.
+    """
+    if question_type == Question.QuestionType.FREE_TEXT:
+        return answer.lower().strip()
+    return answer
+
+
+def grade(key: AnswerKey, user_answer: str) -> tuple:
+    """
+    Returns (correct, result message) for an answer, correct is None when
+    the answer can't be graded (e.g. not a number for a NUMERIC card).
+    """
+    if key.type == Question.QuestionType.NUMERIC:
+        value = parse_number(user_answer)
+        if value is None or key.value is None:
+            return None, 'Invalid input. Please enter a number.'
+        if abs(value - key.value) < key.tolerance:
+            return True, 'Correct!'
+        return False, f'Incorrect. The correct answer is {key.value}.'
+
+    if normalize(key.type, user_answer) == key.normalized:
+        return True, 'Correct!'
+    if key.type == Question.QuestionType.FREE_TEXT:
+        return False, f'Incorrect. The correct answer is "{key.answer}".'
+    return False, f'Incorrect. The correct answer is {key.answer}.'
+
+
+def grade_batch(keys: list, user_answers: list) -> list:
+    """
+    Grades answers[i] against keys[i], returns a list of (correct, result
+    message) like grade(). Unanswered cards give (None, 'No answer.').
+    """
+    return [grade(key, user_answer) if user_answer else (None, 'No answer.')
+            for key, user_answer in zip(keys, user_answers)]
+
+
+class AnswerKeys:
+    """
+    The answer keys of recently graded decks, see the module docstring.
+    """
+
+    def __init__(self, max_decks: int = ANSWER_KEY_MAX_DECKS,
+                 version_ttl: float = ANSWER_KEY_VERSION_TTL):
+        self.max_decks = max_decks
+        self.version_ttl = version_ttl
+        # deck id -> [version, time.monotonic() it was read at, {card id: AnswerKey}]
+        self._decks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, deck_id: int, reload: bool = False) -> dict:
+        """
+        Returns {card id: AnswerKey} of the deck, loading it if it changed
+        (or if reload is set). Cards without a question are left out, a
+        missing deck has no cards.
+        """
+        if not reload:
+            with self._lock:
+                entry = self._decks.get(deck_id)
+                if entry is not None and time.monotonic() - entry[1] < self.version_ttl:
+                    self._decks.move_to_end(deck_id)
+                    return entry[2]
+        version = Deck.objects.filter(pk=deck_id).values_list(
+            'answer_key_version', flat=True).first()
+        if version is None:
+            return {}
+        with self._lock:
+            entry = self._decks.get(deck_id)
+            if not reload and entry is not None and entry[0] == version:
+                entry[1] = time.monotonic()
+                self._decks.move_to_end(deck_id)
+                return entry[2]
+        read_at = time.monotonic()
+        keys = {
+            card_id: AnswerKey(question_type, answer)
+            for card_id, question_type, answer in Card.objects.filter(
+                deck_id=deck_id, question__isnull=False,
+            ).values_list('pk', 'question__type', 'question__answer')
+        }
+        with self._lock:
+            self._decks[deck_id] = [version, read_at, keys]
+            self._decks.move_to_end(deck_id)
+            while len(self._decks) > self.max_decks:
+                self._decks.popitem(last=False)
+        return keys
+
+    def lookup(self, deck_id: int, card_id: int):
+        """
+        Returns the AnswerKey of a card in the deck, or None.
+        A card missing from the key (e.g. added by bulk_create, which sends
+        no signals) makes the deck reload once.
+        """
+        key = self.get(deck_id).get(card_id)
+        if key is None:
+            key = self.get(deck_id, reload=True).get(card_id)
+        return key
+
+    def invalidate(self, deck_ids):
+        """
+        Replaces the answer key version of the given decks, so every process
+        reloads their keys once its copy is ANSWER_KEY_VERSION_TTL seconds
+        old, and drops this process's copy.
+        """
+        deck_ids = list(deck_ids)
+        Deck.objects.filter(pk__in=deck_ids).update(answer_key_version=uuid.uuid4())
+        with self._lock:
+            for deck_id in deck_ids:
+                self._decks.pop(deck_id, None)
+
+
+answer_keys = AnswerKeys()
@@ -0,0 +1,72 @@
+import timeit
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from FlashCardApp.models import Card, Deck, UserProgress
+from FlashCardApp.scheduler import due_progress, next_due_cards
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks next_due_cards for growing decks and progress histories (the data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deck-sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                            help='Cards per benchmarked deck')
+        parser.add_argument('--progress-rows', type=int, default=100000,
+                            help='Progress rows of the user, across all decks')
+        parser.add_argument('--limit', type=int, default=10,
+                            help='Due cards selected per call')
+        parser.add_argument('--iterations', type=int, default=200,
+                            help='Calls per measurement')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        user = get_user_model().objects.create_user(
+            username='due-cards-benchmark', email='due-cards-benchmark@example.com')
+        now = timezone.now()
+        deck_sizes = options['deck_sizes']
+        # the rest of the user's history goes into one more deck
+        filler = max(options['progress_rows'] - sum(deck_sizes), 0)
+        decks = []
+        for size in deck_sizes + [filler]:
+            deck = Deck.objects.create(name=f'Benchmark {size}', author=user, description='')
+            cards = Card.objects.bulk_create([Card(deck=deck) for _ in range(size)],
+                                             batch_size=5000)
+            # a tenth of each deck is due, spread over the last days
+            UserProgress.objects.bulk_create([
+                UserProgress(user=user, card=card, deck=deck,
+                             next_due_at=now + timedelta(hours=number % 10 * 24 - 12))
+                for number, card in enumerate(cards)
+            ], batch_size=5000)
+            decks.append((size, deck))
+        self.stdout.write(f'{UserProgress.objects.filter(user=user).count()} progress rows')
+
+        sql, params = due_progress(user.pk, decks[-1][1].pk, now)[:options['limit']].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}' if connection.vendor == 'sqlite'
+                           else f'EXPLAIN {sql}', params)
+            plan = ' | '.join(str(row[-1]) for row in cursor.fetchall())
+        self.stdout.write(f'plan: {plan}')
+
+        for size, deck in decks[:-1]:
+            seconds = timeit.timeit(
+                lambda: next_due_cards(user.pk, deck.pk, options['limit'], now),
+                number=options['iterations']) / options['iterations']
+            self.stdout.write(f'{size:>7} cards: {seconds * 1000:7.3f} ms per call')
+        self.stdout.write(self.style.SUCCESS(
+            'Selection time should not grow with the deck or the user\'s history'))
@@ -1,12 +1,58 @@
 import random
+from concurrent.futures import ProcessPoolExecutor
+
+import django
 from faker import Faker
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import connection, transaction
 from FlashCardApp.models import Deck, Question, Card, Subject
 
 User = get_user_model()
 
 
+def fake_question_fields(fake):
+    """
+    Returns the fields of a random question, without its subject.
+    """
+    question_type = fake.random_element(Question.QuestionType.values)
+    difficulty = fake.random_element(Question.QuestionDifficulty.values)
+
+    base_fields = {
+        'type': question_type,
+        'difficulty': difficulty,
+        'question': fake.sentence(),
+    }
+
+    if question_type == Question.QuestionType.MULTIPLE_CHOICE:
+        base_fields.update({
+            'answer': fake.word(),
+            'answer_2': fake.word(),
+            'answer_3': fake.word(),
+            'answer_4': fake.word(),
+        })
+    elif question_type == Question.QuestionType.TRUE_FALSE:
+        base_fields['answer'] = fake.random_element(['True', 'False'])
+    elif question_type == Question.QuestionType.FREE_TEXT:
+        base_fields['answer'] = fake.word()
+    else:  # NUMERIC
+        base_fields['answer'] = str(fake.random_number())
+
+    return base_fields
+
+
+def generate_question_fields(chunk):
+    """
+    Returns the fields of a chunk of random questions.
+    chunk is a (count, seed) pair, module level so it can run in a process pool.
+    """
+    count, seed = chunk
+    fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed)
+    return [fake_question_fields(fake) for _ in range(count)]
+
+
 class Command(BaseCommand):
     help = 'Generates random flash cards'
 
@@ -15,11 +61,21 @@ class Command(BaseCommand):
                             help='The number of decks to create')
         parser.add_argument('num_cards_per_deck', type=int,
                             help='The number of cards per deck')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Insert questions and cards with bulk_create in batches of this size')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes generating the fake questions in bulk mode')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed for reproducible datasets')
 
     def handle(self, *args, **options):
         num_decks = options['num_decks']
         num_cards_per_deck = options['num_cards_per_deck']
+        seed = options['seed']
         fake = Faker()
+        if seed is not None:
+            random.seed(seed)
+            fake.seed_instance(seed)
 
         # Get or create a user
         user, created = User.objects.get_or_create(username='testuser')
@@ -31,6 +87,11 @@ class Command(BaseCommand):
 
         subjects = self.get_or_create_subjects(fake)
 
+        if options['batch_size']:
+            self.bulk_create_cards(fake, user, subjects, num_decks, num_cards_per_deck,
+                                   options['batch_size'], options['workers'], seed)
+            return
+
         for _ in range(num_decks):
             deck = self.create_deck(fake, user, subjects)
             self.stdout.write(self.style.SUCCESS(f'Created deck: {deck.name}'))
@@ -98,3 +159,65 @@ class Command(BaseCommand):
 
     def create_card(self, deck, question):
         return Card.objects.create(deck=deck, question=question)
+
+    def bulk_create_cards(self, fake, user, subjects, num_decks, num_cards_per_deck,
+                          batch_size, workers, seed):
+        """
+        Creates the decks, then their questions and cards in chunks of batch_size.
+        Each chunk is one transaction: the questions are bulk created first and
+        the cards reference their returned primary keys.
+        Progress is reported once per chunk instead of once per card.
+        """
+        # without returned ids (e.g. MySQL) decks and questions are saved one by one,
+        # the cards need their primary keys
+        returns_ids = connection.features.can_return_rows_from_bulk_insert
+        decks = self.create_parents(Deck, [
+            Deck(name=fake.unique.catch_phrase(), subject=random.choice(subjects),
+                 author=user, description=fake.text())
+            for _ in range(num_decks)
+        ], returns_ids)
+        self.stdout.write(self.style.SUCCESS(f'Created {len(decks)} decks'))
+
+        num_cards = num_decks * num_cards_per_deck
+        chunks = [
+            (min(batch_size, num_cards - start),
+             None if seed is None else seed + start)
+            for start in range(0, num_cards, batch_size)
+        ]
+        created = 0
+        # spawned workers (Windows, macOS) start without Django, forked ones already have it
+        executor = (ProcessPoolExecutor(workers, initializer=django.setup)
+                    if workers > 1 else None)
+        try:
+            fields_per_chunk = (executor.map(generate_question_fields, chunks)
+                                if executor else map(generate_question_fields, chunks))
+            for question_fields in fields_per_chunk:
+                with transaction.atomic():
+                    questions = self.create_parents(Question, [
+                        Question(subject=random.choice(subjects), **fields)
+                        for fields in question_fields
+                    ], returns_ids)
+                    Card.objects.bulk_create([
+                        # cards are handed out deck by deck
+                        Card(deck=decks[(created + position) // num_cards_per_deck],
+                             question=question)
+                        for position, question in enumerate(questions)
+                    ])
+                created += len(questions)
+                self.stdout.write(f'Created {created}/{num_cards} cards')
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully created {num_decks} decks with {num_cards_per_deck} cards each'))
+
+    def create_parents(self, model, objects, returns_ids):
+        """
+        Creates rows other rows will reference, returns them with their primary keys.
+        """
+        if returns_ids:
+            return model.objects.bulk_create(objects)
+        for obj in objects:
+            obj.save()
+        return objects
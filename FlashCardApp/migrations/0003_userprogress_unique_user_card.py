@@ -0,0 +1,48 @@
+# Generated by Django 5.0.6 on 2026-10-18 00:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_progress(apps, schema_editor):
+    """
+    Progress rows used to be created without a uniqueness check, so a (user, card)
+    pair may have several. They are merged into the newest one: the attempts are
+    summed and the latest attempt date is kept.
+    """
+    UserProgress = apps.get_model('FlashCardApp', 'UserProgress')
+    progress = UserProgress.objects.using(schema_editor.connection.alias)
+    duplicates = progress.values('user_id', 'card_id').annotate(
+        rows=models.Count('id')).filter(rows__gt=1).order_by()
+    for pair in duplicates:
+        rows = progress.filter(user_id=pair['user_id'], card_id=pair['card_id'])
+        totals = rows.aggregate(
+            correct=models.Sum('correct_attempts'), total=models.Sum('total_attempts'),
+            last=models.Max('last_attempt_date'), keep=models.Max('id'))
+        # update() leaves last_attempt_date alone, save() would set it to now
+        rows.filter(id=totals['keep']).update(
+            correct_attempts=totals['correct'], total_attempts=totals['total'],
+            last_attempt_date=totals['last'])
+        rows.exclude(id=totals['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FlashCardApp', '0002_subject_question_subject_alter_deck_subject'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='card',
+            name='deck',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cards', to='FlashCardApp.deck'),
+        ),
+        migrations.RunPython(merge_duplicate_progress, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'card'), name='unique_user_progress_per_card'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 00:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_progress_decks(apps, schema_editor):
+    UserProgress = apps.get_model('FlashCardApp', 'UserProgress')
+    Card = apps.get_model('FlashCardApp', 'Card')
+    UserProgress.objects.update(deck_id=models.Subquery(
+        Card.objects.filter(pk=models.OuterRef('card_id')).values('deck_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FlashCardApp', '0003_userprogress_unique_user_card'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprogress',
+            name='deck',
+            field=models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.CASCADE, to='FlashCardApp.deck'),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='ease_factor',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='interval_days',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='next_due_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='userprogress',
+            name='repetitions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_progress_decks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(fields=['user', 'deck', 'next_due_at'], name='userprogress_due_idx'),
+        ),
+    ]
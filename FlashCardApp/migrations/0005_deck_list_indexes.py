@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 00:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FlashCardApp', '0004_userprogress_schedule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deck',
+            index=models.Index(fields=['-created_at', '-id'], name='deck_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deck',
+            index=models.Index(fields=['subject', '-created_at', '-id'], name='deck_subject_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deck',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='deck_author_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 00:45
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('FlashCardApp', '0005_deck_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deck',
+            name='answer_key_version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
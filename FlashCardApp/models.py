@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Subject(models.Model):
@@ -24,6 +27,16 @@ class Deck(models.Model):
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # replaced whenever a card or question of the deck changes (see FlashCardApp.grading)
+    answer_key_version = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    class Meta:
+        indexes = [
+            # serve the keyset pagination of the deck list, also when filtered
+            models.Index(fields=['-created_at', '-id'], name='deck_created_at_id_idx'),
+            models.Index(fields=['subject', '-created_at', '-id'], name='deck_subject_created_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='deck_author_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -90,6 +103,25 @@ class UserProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
     card = models.ForeignKey(Card, on_delete=models.CASCADE)
+    # the card's deck, so the due queue of a deck is one index range
+    deck = models.ForeignKey(Deck, on_delete=models.CASCADE, null=True, default=None)
     correct_attempts = models.IntegerField(default=0)
     total_attempts = models.IntegerField(default=0)
     last_attempt_date = models.DateTimeField(auto_now=True)
+
+    # SM-2 schedule, see FlashCardApp.scheduler
+    ease_factor = models.FloatField(default=2.5)
+    interval_days = models.IntegerField(default=0)
+    repetitions = models.IntegerField(default=0)
+    next_due_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # one row per user and card, written by FlashCardApp.progress
+            models.UniqueConstraint(fields=['user', 'card'], name='unique_user_progress_per_card'),
+        ]
+        indexes = [
+            # serves next_due_cards: the due cards of a user in a deck
+            models.Index(fields=['user', 'deck', 'next_due_at'],
+                         name='userprogress_due_idx'),
+        ]
@@ -0,0 +1,235 @@
+"""
+Write-behind recording of card answers into UserProgress.
+
+Recording an answer directly costs a get_or_create and an update, each
+taking a row lock, per submit. The ProgressRecorder only adds the attempt
+to an in-memory buffer keyed by (user, card), and a background thread
+flushes the buffer every PROGRESS_FLUSH_INTERVAL seconds in one transaction:
+    - one INSERT ... ON CONFLICT DO NOTHING creating the missing rows
+    - one UPDATE with F() increments per PROGRESS_UPDATE_BATCH_SIZE rows
+      sharing the same increments (mostly +1/+1 and +0/+1)
+    - one SELECT ... FOR UPDATE and one bulk UPDATE of the SM-2 schedule
+      (see FlashCardApp.scheduler) per PROGRESS_UPDATE_BATCH_SIZE rows
+A crashed process loses at most the attempts of the last interval.
+A failed flush puts its attempts back into the buffer for the next one, and
+a flusher thread that died is started again by the next attempt recorded.
+A buffer reaching PROGRESS_BUFFER_SIZE pairs means the flusher is behind or
+failing: the attempt filling it flushes synchronously, and if that fails too
+the pairs beyond PROGRESS_BUFFER_SIZE are dropped with an error.
+With settings.PROGRESS_WRITE_BEHIND off, or if the thread can't be started,
+each attempt is written right away by the same batched code.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from BaseApp.utils import get_module_logger
+
+from .models import Card, UserProgress
+from .scheduler import review
+
+module_logger = get_module_logger("progress", __file__)
+
+PROGRESS_FLUSH_INTERVAL = 2.0
+PROGRESS_BUFFER_SIZE = 10000
+# (user, card) pairs per UPDATE, keeps the WHERE clause within SQLite's limits
+PROGRESS_UPDATE_BATCH_SIZE = 100
+
+
+def batches(keys: list):
+    for start in range(0, len(keys), PROGRESS_UPDATE_BATCH_SIZE):
+        yield keys[start:start + PROGRESS_UPDATE_BATCH_SIZE]
+
+
+def pairs_filter(keys) -> Q:
+    return reduce(or_, (Q(user_id=user_id, card_id=card_id) for user_id, card_id in keys))
+
+
+def write_attempts(attempts: dict) -> int:
+    """
+    Adds {(user_id, card_id): [correct, ...]} (the outcomes of the answers,
+    in order) to the UserProgress rows in one transaction, creating missing
+    rows and rescheduling the cards. Attempts on deleted cards or users are
+    dropped. Returns the number of rows updated.
+    """
+    user_ids = {user_id for user_id, _ in attempts}
+    card_ids = {card_id for _, card_id in attempts}
+    with transaction.atomic():
+        existing_users = set(get_user_model().objects.filter(
+            pk__in=user_ids).values_list('pk', flat=True))
+        card_decks = dict(Card.objects.filter(pk__in=card_ids).values_list('pk', 'deck_id'))
+        attempts = {key: outcomes for key, outcomes in attempts.items()
+                    if key[0] in existing_users and key[1] in card_decks}
+        UserProgress.objects.bulk_create(
+            [UserProgress(user_id=user_id, card_id=card_id, deck_id=card_decks[card_id])
+             for user_id, card_id in attempts],
+            ignore_conflicts=True)
+
+        by_increment = defaultdict(list)
+        for key, outcomes in attempts.items():
+            by_increment[sum(outcomes), len(outcomes)].append(key)
+        now = timezone.now()
+        updated = 0
+        for (correct, total), keys in by_increment.items():
+            for batch in batches(keys):
+                updated += UserProgress.objects.filter(pairs_filter(batch)).update(
+                    correct_attempts=F('correct_attempts') + correct,
+                    total_attempts=F('total_attempts') + total,
+                    last_attempt_date=now,
+                )
+
+        for batch in batches(list(attempts)):
+            rows = list(UserProgress.objects.select_for_update().filter(pairs_filter(batch)).only(
+                'user_id', 'card_id', 'ease_factor', 'interval_days', 'repetitions', 'next_due_at'))
+            for progress in rows:
+                for correct in attempts[progress.user_id, progress.card_id]:
+                    review(progress, correct, now)
+            UserProgress.objects.bulk_update(
+                rows, ['ease_factor', 'interval_days', 'repetitions', 'next_due_at'])
+    return updated
+
+
+class ProgressRecorder:
+    """
+    Buffers answer attempts and writes them behind, see the module docstring.
+    flush_interval=None never starts a thread, attempts wait for flush().
+
+    Example usage:
+        progress_recorder.record(request.user.pk, card.pk, correct=True)
+        progress_recorder.flush()  # write everything buffered so far
+    """
+
+    def __init__(self, flush_interval=PROGRESS_FLUSH_INTERVAL,
+                 max_pairs: int = PROGRESS_BUFFER_SIZE):
+        self.flush_interval = flush_interval
+        self.max_pairs = max_pairs
+        # (user id, card id) -> outcomes of the answers, in order
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, user_id: int, card_id: int, correct: bool):
+        self.record_many(user_id, {card_id: correct})
+
+    def record_many(self, user_id: int, outcomes: dict):
+        """
+        Records {card_id: correct} answered by the user, e.g. a graded quiz.
+        """
+        if not getattr(settings, 'PROGRESS_WRITE_BEHIND', True):
+            write_attempts({(user_id, card_id): [correct] for card_id, correct in outcomes.items()})
+            return
+        if self.flush_interval is not None and not self._ensure_flusher():
+            module_logger.warning("progress flusher unavailable, writing attempts synchronously")
+            write_attempts({(user_id, card_id): [correct] for card_id, correct in outcomes.items()})
+            return
+        with self._lock:
+            for card_id, correct in outcomes.items():
+                self._pending.setdefault((user_id, card_id), []).append(correct)
+            full = len(self._pending) >= self.max_pairs
+        if full:
+            self._flush_overflow()
+
+    def flush(self) -> int:
+        """
+        Writes the buffered attempts, returns the number of rows updated.
+        If writing fails the attempts are buffered again and the error is raised.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            return write_attempts(pending)
+        except Exception:
+            with self._lock:
+                for key, outcomes in pending.items():
+                    # older attempts first
+                    self._pending[key] = outcomes + self._pending.get(key, [])
+            raise
+
+    def _flush_overflow(self):
+        try:
+            self.flush()
+        except Exception:
+            module_logger.exception("synchronous progress flush of a full buffer failed")
+            with self._lock:
+                overflow = list(self._pending)[self.max_pairs:]
+                for key in overflow:
+                    del self._pending[key]
+            if overflow:
+                module_logger.error("progress buffer full, dropped the attempts of {} pairs",
+                                    len(overflow))
+
+    def _ensure_flusher(self) -> bool:
+        if self._flusher_pid == os.getpid() and self._flusher.is_alive():
+            return True
+        with self._lock:
+            if self._flusher_pid != os.getpid():
+                # a forked worker has neither the thread nor the attempts of its parent
+                self._pending = {}
+            elif self._flusher.is_alive():
+                return True
+            else:
+                module_logger.error("progress flusher died, starting a new one")
+            flusher = threading.Thread(target=self._flush_periodically,
+                                       name="progress-recorder", daemon=True)
+            try:
+                flusher.start()
+            except RuntimeError:
+                return False
+            self._flusher, self._flusher_pid = flusher, os.getpid()
+        return True
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                # the attempts stay buffered for the next interval
+                module_logger.exception("progress flush of {} pairs failed", len(self))
+
+
+progress_recorder = ProgressRecorder()
+
+
+def record_attempt(user_id: int, card_id: int, correct: bool):
+    """
+    Records an answer to a card in the user's progress, written behind.
+    """
+    progress_recorder.record(user_id, card_id, correct)
+
+
+def record_attempts(user_id: int, outcomes: dict):
+    """
+    Records the answers of a user to several cards ({card_id: correct}) at once.
+    """
+    progress_recorder.record_many(user_id, outcomes)
+
+
+def flush_progress():
+    """
+    Writes every buffered attempt, e.g. before reading UserProgress.
+    """
+    try:
+        progress_recorder.flush()
+    except Exception:
+        module_logger.exception("progress flush of {} pairs failed", len(progress_recorder))
+
+
+atexit.register(flush_progress)
@@ -0,0 +1,41 @@
+"""
+Quiz sessions: a shuffled batch of a deck's cards answered in one form.
+
+The batch is drawn from the deck's answer key (see FlashCardApp.grading)
+and kept in the user's session, so the POST answering it is graded as a
+whole by grade_batch and recorded with one record_attempts call.
+A session holds at most one quiz per deck, starting a new one replaces it.
+
+Example usage:
+    card_ids = start_quiz(request.session, deck.pk, answer_keys.get(deck.pk))
+    ...
+    card_ids = pop_quiz(request.session, deck.pk)  # None if no quiz was started
+"""
+import random
+
+QUIZ_BATCH_SIZE = 10
+QUIZ_SESSION_KEY = 'flashcards_quizzes'
+
+
+def start_quiz(session, deck_id: int, card_ids, size: int = QUIZ_BATCH_SIZE) -> list:
+    """
+    Draws up to `size` of card_ids in random order and stores them as the deck's quiz.
+    """
+    card_ids = list(card_ids)
+    batch = random.sample(card_ids, min(size, len(card_ids)))
+    quizzes = session.get(QUIZ_SESSION_KEY, {})
+    # session keys are strings once serialized
+    quizzes[str(deck_id)] = batch
+    session[QUIZ_SESSION_KEY] = quizzes
+    return batch
+
+
+def pop_quiz(session, deck_id: int):
+    """
+    Returns the card ids of the deck's quiz and ends it, or None.
+    """
+    quizzes = session.get(QUIZ_SESSION_KEY, {})
+    batch = quizzes.pop(str(deck_id), None)
+    if batch is not None:
+        session[QUIZ_SESSION_KEY] = quizzes
+    return batch
@@ -0,0 +1,81 @@
+"""
+SM-2 spaced repetition over UserProgress.
+
+Each (user, card) row keeps an ease factor, an interval and the time the
+card is due again. Answers update them as they are flushed by
+FlashCardApp.progress: a correct answer pushes the card 1, then 6, then
+interval * ease days out, a wrong one brings it back tomorrow and lowers
+the ease. Rows also carry the card's deck, so "what should this user study
+next in this deck" is a range scan of the (user, deck, next_due_at) index,
+whatever the size of the deck or of the user's history.
+
+Example usage:
+    enroll(user.pk, deck.pk)  # every card of the deck is due now
+    next_due_cards(user.pk, deck.pk, 10)
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Card, UserProgress
+
+SM2_MIN_EASE = 1.3
+# answers are right or wrong, graded as SM-2 qualities (0-5)
+QUALITY_CORRECT = 4
+QUALITY_INCORRECT = 1
+
+
+def review(progress: UserProgress, correct: bool, reviewed_at=None):
+    """
+    Applies one answer to the schedule of a progress row, without saving it.
+    """
+    reviewed_at = reviewed_at or timezone.now()
+    quality = QUALITY_CORRECT if correct else QUALITY_INCORRECT
+    if quality >= 3:
+        if progress.repetitions == 0:
+            progress.interval_days = 1
+        elif progress.repetitions == 1:
+            progress.interval_days = 6
+        else:
+            progress.interval_days = round(progress.interval_days * progress.ease_factor)
+        progress.repetitions += 1
+    else:
+        progress.repetitions = 0
+        progress.interval_days = 1
+    progress.ease_factor = max(
+        SM2_MIN_EASE,
+        progress.ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    progress.next_due_at = reviewed_at + timedelta(days=progress.interval_days)
+
+
+def enroll(user_id: int, deck_id: int) -> int:
+    """
+    Makes every card of the deck the user has no progress on due now.
+    Returns the number of cards added to the user's queue.
+    """
+    now = timezone.now()
+    card_ids = Card.objects.filter(deck_id=deck_id).exclude(
+        userprogress__user_id=user_id).values_list('pk', flat=True)
+    created = UserProgress.objects.bulk_create(
+        [UserProgress(user_id=user_id, card_id=card_id, deck_id=deck_id, next_due_at=now)
+         for card_id in card_ids],
+        ignore_conflicts=True, batch_size=1000)
+    return len(created)
+
+
+def due_progress(user_id: int, deck_id: int, now=None):
+    """
+    Returns the user's progress rows in the deck that are due, most overdue first.
+    """
+    return UserProgress.objects.filter(
+        user_id=user_id, deck_id=deck_id, next_due_at__lte=now or timezone.now(),
+    ).order_by('next_due_at')
+
+
+def next_due_cards(user_id: int, deck_id: int, limit: int = 10, now=None) -> list:
+    """
+    Returns the next cards (with their question) the user should study in the deck.
+    One query reading at most `limit` entries of the due index.
+    """
+    rows = due_progress(user_id, deck_id, now).select_related('card__question')[:limit]
+    return [progress.card for progress in rows]
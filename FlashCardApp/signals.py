@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .grading import answer_keys
+from .models import Card, Question
+
+
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Card)
+def invalidate_card_answer_key(sender, instance, **kwargs):
+    """The answer key of the card's deck holds its question."""
+    answer_keys.invalidate([instance.deck_id])
+
+
+@receiver(post_save, sender=Question)
+@receiver(pre_delete, sender=Question)
+def invalidate_question_answer_keys(sender, instance, using, **kwargs):
+    """
+    Every deck with a card asking the question has its answer in its key.
+    On delete the decks are found before the cards' question is set to NULL.
+    """
+    answer_keys.invalidate(Card.objects.using(using).filter(
+        question_id=instance.pk).values_list('deck_id', flat=True).distinct())
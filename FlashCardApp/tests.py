@@ -1,3 +1,550 @@
-from django.test import TestCase
+import os
+import time
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .grading import ANSWER_KEY_VERSION_TTL, AnswerKey, AnswerKeys, grade, grade_batch
+from .models import Card, Deck, Question, Subject, UserProgress
+from .progress import ProgressRecorder
+from .quiz import QUIZ_SESSION_KEY
+from .scheduler import enroll, next_due_cards, review
+
+User = get_user_model()
+
+
+class GenerateFlashCardsCommandTests(TestCase):
+    """
+    Test the bulk mode of the generate_flash_cards command
+    """
+
+    def generate(self, *args):
+        call_command('generate_flash_cards', *args, stdout=StringIO())
+
+    def test_bulk_mode_fills_every_deck(self):
+        self.generate('3', '7', '--batch-size', '5', '--seed', '1')
+        self.assertEqual(Deck.objects.count(), 3)
+        self.assertEqual(Question.objects.count(), 21)
+        for deck in Deck.objects.all():
+            self.assertEqual(deck.cards.count(), 7)
+        self.assertFalse(Card.objects.filter(question=None).exists())
+
+    def test_bulk_mode_without_returned_ids(self):
+        """Test that backends not returning bulk inserted ids still link every card"""
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert',
+                               new_callable=mock.PropertyMock, return_value=False):
+            self.generate('2', '3', '--batch-size', '4', '--seed', '1')
+        for deck in Deck.objects.all():
+            self.assertEqual(deck.cards.count(), 3)
+        self.assertFalse(Card.objects.filter(question=None).exists())
+
+    def test_bulk_mode_reports_progress_per_chunk(self):
+        stdout = StringIO()
+        call_command('generate_flash_cards', '2', '10', '--batch-size', '10',
+                     '--seed', '1', stdout=stdout)
+        self.assertEqual(stdout.getvalue().count('cards\n'), 2)
+
+    def test_seed_makes_questions_reproducible(self):
+        self.generate('1', '6', '--batch-size', '4', '--seed', '42')
+        first = list(Question.objects.order_by('id').values_list('type', 'question', 'answer'))
+        Question.objects.all().delete()
+        self.generate('1', '6', '--batch-size', '4', '--seed', '42')
+        second = list(Question.objects.order_by('id').values_list('type', 'question', 'answer'))
+        self.assertEqual(first, second)
+
+
+class DeckDetailViewTests(TestCase):
+    """
+    Test the deck detail section
+    """
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='deckauthor', email='deckauthor@example.com', password='password123')
+        cls.deck = Deck.objects.create(name='Big Deck', author=author, description='Lots of cards')
+        questions = Question.objects.bulk_create([
+            Question(type=Question.QuestionType.FREE_TEXT,
+                     question=f'Question {number}', answer='answer')
+            for number in range(500)
+        ])
+        Card.objects.bulk_create([Card(deck=cls.deck, question=question)
+                                  for question in questions])
+
+    def test_deck_detail_query_count_is_fixed(self):
+        """Test that the cards and their questions are fetched in a fixed number of queries"""
+        url = reverse('FlashCardApp:deck_detail', args=[self.deck.id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_HX_REQUEST='true')
+        self.assertContains(response, 'Cards: 500')
+        self.assertContains(response, 'Question 499')
+
+
+class DeckListTests(TestCase):
+    """
+    Test the paginated deck list
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='deckauthor', email='deckauthor@example.com', password='password123')
+        cls.subject = Subject.objects.create(name='Maths')
+        cls.decks = Deck.objects.bulk_create([
+            Deck(name=f'Deck {number}', author=cls.author, description='',
+                 subject=cls.subject if number % 2 else None)
+            for number in range(30)
+        ])
+        Card.objects.bulk_create([Card(deck=cls.decks[0]) for _ in range(3)])
+
+    def get(self, **params):
+        return self.client.get(reverse('FlashCardApp:deck_list'), params, HTTP_HX_REQUEST='true')
+
+    def test_first_page_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.get()
+        decks = list(response.context['decks'])
+        self.assertEqual(len(decks), 24)
+        self.assertContains(response, 'hx-trigger="intersect once"')
+        # scrolling must not push the URL of a partial page into the history
+        self.assertContains(response, 'hx-push-url="false"')
+        self.assertEqual({deck.card_count for deck in decks}, {0})
+
+    def test_scrolling_reaches_every_deck_once(self):
+        first = self.get().context['decks']
+        response = self.get(cursor=first.next_cursor)
+        self.assertTemplateNotUsed(response, 'FlashCardApp/sections/deck_list.html')
+        self.assertNotContains(response, 'hx-trigger="intersect once"')
+        decks = list(first) + list(response.context['decks'])
+        self.assertEqual(sorted(deck.pk for deck in decks), sorted(deck.pk for deck in self.decks))
+        self.assertEqual({deck.pk: deck.card_count for deck in decks}[self.decks[0].pk], 3)
+
+    def test_filters(self):
+        decks = self.get(subject=self.subject.pk).context['decks']
+        self.assertEqual(len(decks), 15)
+        self.assertTrue(all(deck.subject_id == self.subject.pk for deck in decks))
+        self.assertEqual(len(self.get(author=self.author.pk + 1).context['decks']), 0)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.get(cursor='not-a-cursor').status_code, 400)
+        self.assertEqual(self.get(subject='maths').status_code, 400)
+
+
+class SectionControlsTests(TestCase):
+    """
+    Test that sections bring their back button and options menu along
+    """
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='deckauthor', email='deckauthor@example.com', password='password123')
+        cls.deck = Deck.objects.create(name='Small Deck', author=author, description='A few cards')
+
+    def get(self, url):
+        return self.client.get(url, HTTP_HX_REQUEST='true')
+
+    def assertControlsSwappedOutOfBand(self, response, previous_url):
+        self.assertContains(response, '<div id="flash-card-back-button" hx-swap-oob="innerHTML">')
+        self.assertContains(response, '<div id="flashcard-app-menu-toggle-content" hx-swap-oob="innerHTML">')
+        self.assertContains(response, previous_url)
+        # no follow-up requests for the controls
+        self.assertNotContains(response, 'hx-trigger="load"')
+
+    def test_deck_list_swaps_controls_out_of_band(self):
+        response = self.get(reverse('FlashCardApp:deck_list'))
+        self.assertControlsSwappedOutOfBand(response, reverse('BaseApp:home'))
+        self.assertContains(response, 'Option goo')
+
+    def test_deck_detail_swaps_controls_out_of_band(self):
+        response = self.get(reverse('FlashCardApp:deck_detail', args=[self.deck.id]))
+        self.assertControlsSwappedOutOfBand(response, reverse('FlashCardApp:deck_list'))
+        self.assertContains(response, 'Option 1')
+
+    def test_standalone_endpoints_still_respond(self):
+        for url in (reverse('FlashCardApp:deck_list_options'),
+                    reverse('FlashCardApp:deck_options', args=[self.deck.id]),
+                    reverse('BaseApp:back-button', args=['FlashCardApp:deck_list', 'none'])):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, 200)
+
+
+class ProgressRecorderTests(TestCase):
+    """
+    Test the write-behind recording of answers into UserProgress
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='student', email='student@example.com', password='password123')
+        deck = Deck.objects.create(name='Deck', author=cls.user, description='A deck')
+        questions = Question.objects.bulk_create([
+            Question(type=Question.QuestionType.TRUE_FALSE, question=f'Q{number}', answer='True')
+            for number in range(150)
+        ])
+        cls.cards = Card.objects.bulk_create([Card(deck=deck, question=question)
+                                              for question in questions])
+
+    def setUp(self):
+        self.recorder = ProgressRecorder(flush_interval=None)
+        use_fresh_answer_keys(self)
+
+    def progress(self, card):
+        return UserProgress.objects.values_list('correct_attempts', 'total_attempts').get(
+            user=self.user, card=card)
+
+    def test_attempts_are_buffered_until_flushed(self):
+        card = self.cards[0]
+        for correct in (True, False, True):
+            self.recorder.record(self.user.pk, card.pk, correct)
+        self.assertFalse(UserProgress.objects.exists())
+        self.recorder.flush()
+        self.assertEqual(self.progress(card), (2, 3))
+        self.assertEqual(len(self.recorder), 0)
+
+    def test_flush_is_batched(self):
+        """Test that 150 pairs with the same increments take a fixed number of queries."""
+        for card in self.cards:
+            self.recorder.record(self.user.pk, card.pk, True)
+        # savepoint, users, cards, two inserts (SQLite's variable limit),
+        # two updates of 100 and 50 rows, two selects and two updates of
+        # their schedules, release
+        with self.assertNumQueries(12):
+            self.assertEqual(self.recorder.flush(), 150)
+
+    def test_flush_increments_existing_rows(self):
+        card = self.cards[0]
+        self.recorder.record(self.user.pk, card.pk, True)
+        self.recorder.flush()
+        self.recorder.record(self.user.pk, card.pk, False)
+        self.recorder.flush()
+        self.assertEqual(self.progress(card), (1, 2))
+        self.assertEqual(UserProgress.objects.count(), 1)
+
+    def test_failed_flush_keeps_attempts(self):
+        card = self.cards[0]
+        self.recorder.record(self.user.pk, card.pk, True)
+        with mock.patch('FlashCardApp.progress.write_attempts', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.recorder.flush()
+        self.assertEqual(len(self.recorder), 1)
+        self.recorder.flush()
+        self.assertEqual(self.progress(card), (1, 1))
+
+    def test_full_buffer_is_flushed_synchronously(self):
+        recorder = ProgressRecorder(flush_interval=None, max_pairs=2)
+        recorder.record_many(self.user.pk, {self.cards[0].pk: True, self.cards[1].pk: False})
+        self.assertEqual(len(recorder), 0)
+        self.assertEqual(self.progress(self.cards[1]), (0, 1))
+
+    def test_full_buffer_drops_overflow_when_flushing_fails(self):
+        recorder = ProgressRecorder(flush_interval=None, max_pairs=2)
+        with mock.patch('FlashCardApp.progress.write_attempts', side_effect=DatabaseError):
+            recorder.record_many(self.user.pk, {card.pk: True for card in self.cards[:3]})
+        self.assertEqual(len(recorder), 2)
+
+    def test_flusher_survives_any_error(self):
+        class Stop(Exception):
+            pass
+
+        recorder = ProgressRecorder(flush_interval=0)
+        with mock.patch('FlashCardApp.progress.time.sleep', side_effect=[None, None, Stop]), \
+                mock.patch.object(recorder, 'flush', side_effect=[ValueError, 0]) as flush:
+            with self.assertRaises(Stop):
+                recorder._flush_periodically()
+        self.assertEqual(flush.call_count, 2)
+
+    def test_dead_flusher_is_restarted(self):
+        recorder = ProgressRecorder()
+        recorder._flusher = mock.Mock(is_alive=mock.Mock(return_value=False))
+        recorder._flusher_pid = os.getpid()
+        recorder._pending = {(self.user.pk, self.cards[0].pk): [True]}
+        with mock.patch('FlashCardApp.progress.threading.Thread') as thread:
+            self.assertTrue(recorder._ensure_flusher())
+        thread.return_value.start.assert_called_once()
+        self.assertIs(recorder._flusher, thread.return_value)
+        self.assertEqual(len(recorder), 1)
+
+    def test_attempts_on_deleted_cards_are_dropped(self):
+        card = self.cards[0]
+        self.recorder.record(self.user.pk, card.pk, True)
+        card.delete()
+        self.assertEqual(self.recorder.flush(), 0)
+
+    def answer(self, card, answer='True'):
+        self.client.force_login(self.user)
+        return self.client.post(reverse('FlashCardApp:card_answer_result', args=[card.pk]),
+                                {'answer': answer}, HTTP_HX_REQUEST='true')
+
+    def test_answers_are_recorded_behind(self):
+        card = self.cards[0]
+        with mock.patch('FlashCardApp.progress.progress_recorder', self.recorder):
+            self.assertContains(self.answer(card), 'Correct!')
+        self.assertFalse(UserProgress.objects.exists())
+        self.recorder.flush()
+        self.assertEqual(self.progress(card), (1, 1))
+
+    @override_settings(PROGRESS_WRITE_BEHIND=False)
+    def test_synchronous_fallback(self):
+        card = self.cards[0]
+        self.answer(card, 'False')
+        self.assertEqual(self.progress(card), (0, 1))
+
+
+def use_fresh_answer_keys(test_case) -> AnswerKeys:
+    """
+    Gives the views and signals empty answer keys for the test, the keys of
+    this process would outlive the rolled back decks of other tests.
+    """
+    answer_keys = AnswerKeys()
+    for target in ('FlashCardApp.views.answer_keys', 'FlashCardApp.signals.answer_keys'):
+        patcher = mock.patch(target, answer_keys)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+    return answer_keys
+
+
+class AnswerKeyTests(TestCase):
+    """
+    Test grading from the per deck answer keys
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='student', email='student@example.com', password='password123')
+        cls.deck = Deck.objects.create(name='Deck', author=cls.user, description='A deck')
+        cls.other_deck = Deck.objects.create(name='Other', author=cls.user, description='')
+        cls.questions = Question.objects.bulk_create([
+            Question(type=Question.QuestionType.TRUE_FALSE, question='Q', answer='True'),
+            Question(type=Question.QuestionType.FREE_TEXT, question='Q', answer=' Paris'),
+            Question(type=Question.QuestionType.NUMERIC, question='Q', answer='3.14'),
+        ])
+        cls.cards = Card.objects.bulk_create([Card(deck=cls.deck, question=question)
+                                              for question in cls.questions])
+
+    def setUp(self):
+        self.answer_keys = use_fresh_answer_keys(self)
+
+    def grade(self, card, answer):
+        return grade(self.answer_keys.lookup(self.deck.pk, card.pk), answer)
+
+    def test_grading(self):
+        true_false, free_text, numeric = self.cards
+        self.assertEqual(self.grade(true_false, 'True'), (True, 'Correct!'))
+        self.assertEqual(self.grade(true_false, 'False'),
+                         (False, 'Incorrect. The correct answer is True.'))
+        self.assertEqual(self.grade(free_text, 'paris '), (True, 'Correct!'))
+        self.assertEqual(self.grade(free_text, 'Rome'),
+                         (False, 'Incorrect. The correct answer is " Paris".'))
+        self.assertEqual(self.grade(numeric, '3.141'), (True, 'Correct!'))
+        self.assertEqual(self.grade(numeric, '3'),
+                         (False, 'Incorrect. The correct answer is 3.14.'))
+        self.assertEqual(self.grade(numeric, 'pi'),
+                         (None, 'Invalid input. Please enter a number.'))
+
+    def test_warm_deck_runs_no_queries(self):
+        with self.assertNumQueries(2):
+            self.answer_keys.get(self.deck.pk)
+        for card in self.cards:
+            with self.assertNumQueries(0):
+                self.grade(card, 'True')
+
+    def test_version_is_read_again_after_its_ttl(self):
+        self.answer_keys.get(self.deck.pk)
+        now = time.monotonic() + ANSWER_KEY_VERSION_TTL
+        with mock.patch('FlashCardApp.grading.time.monotonic', return_value=now):
+            with self.assertNumQueries(1):
+                self.grade(self.cards[0], 'True')
+            with self.assertNumQueries(0):
+                self.grade(self.cards[1], 'True')
+
+    def test_changes_reach_every_process(self):
+        """Test that a key loaded elsewhere is reloaded once its version in the database is stale"""
+        other_process = AnswerKeys()
+        card = self.cards[0]
+        self.assertTrue(grade(other_process.lookup(self.deck.pk, card.pk), 'True')[0])
+        Question.objects.filter(pk=self.questions[0].pk).update(answer='False')
+        self.answer_keys.invalidate([self.deck.pk])
+        now = time.monotonic() + ANSWER_KEY_VERSION_TTL
+        with mock.patch('FlashCardApp.grading.time.monotonic', return_value=now):
+            self.assertFalse(grade(other_process.lookup(self.deck.pk, card.pk), 'True')[0])
+
+    def test_saving_a_question_reloads_the_key(self):
+        card = self.cards[0]
+        self.assertTrue(self.grade(card, 'True')[0])
+        question = self.questions[0]
+        question.answer = 'False'
+        question.save()
+        self.assertFalse(self.grade(card, 'True')[0])
+
+    def test_deleting_a_question_replaces_the_deck_version(self):
+        card = self.cards[0]
+        self.assertTrue(self.grade(card, 'True')[0])
+        version = Deck.objects.values_list('answer_key_version', flat=True).get(pk=self.deck.pk)
+        self.questions[0].delete()
+        self.assertNotEqual(
+            Deck.objects.values_list('answer_key_version', flat=True).get(pk=self.deck.pk), version)
+        self.assertIsNone(self.answer_keys.lookup(self.deck.pk, card.pk))
+        # another process's key of the old version stops matching too
+        other_process = AnswerKeys(version_ttl=0)
+        other_process._decks[self.deck.pk] = [version, 0, {card.pk: AnswerKey(Question.QuestionType.TRUE_FALSE, 'True')}]
+        self.assertIsNone(other_process.lookup(self.deck.pk, card.pk))
+
+    def test_bulk_created_cards_are_found(self):
+        self.answer_keys.get(self.deck.pk)
+        # bulk_create sends no signals, the missing card reloads the key
+        card, = Card.objects.bulk_create([Card(deck=self.deck, question=self.questions[0])])
+        self.assertTrue(self.grade(card, 'True')[0])
+
+    def answer(self, url, answer='True'):
+        self.client.force_login(self.user)
+        with mock.patch('FlashCardApp.progress.progress_recorder', ProgressRecorder(flush_interval=None)):
+            return self.client.post(url, {'answer': answer}, HTTP_HX_REQUEST='true')
+
+    def test_answer_view(self):
+        card = self.cards[0]
+        url = reverse('FlashCardApp:deck_card_answer_result', args=[self.deck.pk, card.pk])
+        self.assertContains(self.answer(url), 'Correct!')
+        self.assertContains(self.answer(url, ''), 'Please enter an answer!')
+        # forms rendered before the deck was part of the URL
+        self.assertContains(self.answer(reverse('FlashCardApp:card_answer_result', args=[card.pk])),
+                            'Correct!')
+
+    def test_card_of_another_deck_is_not_found(self):
+        url = reverse('FlashCardApp:deck_card_answer_result', args=[self.other_deck.pk, self.cards[0].pk])
+        self.assertEqual(self.answer(url).status_code, 404)
+
+
+class QuizTests(TestCase):
+    """
+    Test quiz sessions graded as a batch
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='student', email='student@example.com', password='password123')
+        cls.deck = Deck.objects.create(name='Deck', author=cls.user, description='A deck')
+        questions = Question.objects.bulk_create([
+            Question(type=Question.QuestionType.NUMERIC, question=f'Q{number}', answer=str(number))
+            for number in range(12)
+        ])
+        cls.cards = Card.objects.bulk_create([Card(deck=cls.deck, question=question)
+                                              for question in questions])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        use_fresh_answer_keys(self)
+
+    def test_grade_batch_matches_grade(self):
+        keys = [AnswerKey(Question.QuestionType.NUMERIC, '1.5'),
+                AnswerKey(Question.QuestionType.NUMERIC, '1.5'),
+                AnswerKey(Question.QuestionType.NUMERIC, '1.5'),
+                AnswerKey(Question.QuestionType.FREE_TEXT, 'Paris'),
+                AnswerKey(Question.QuestionType.TRUE_FALSE, 'True')]
+        answers = ['1.505', '2', 'x', 'PARIS', 'False']
+        expected = [grade(key, answer) for key, answer in zip(keys, answers)]
+        self.assertEqual(grade_batch(keys, answers), expected)
+        self.assertEqual(grade_batch(keys[:1], ['']), [(None, 'No answer.')])
+
+    def test_quiz_is_graded_and_recorded_at_once(self):
+        response = self.client.get(reverse('FlashCardApp:quiz', args=[self.deck.pk]),
+                                   HTTP_HX_REQUEST='true')
+        card_ids = self.client.session[QUIZ_SESSION_KEY][str(self.deck.pk)]
+        self.assertEqual(len(card_ids), 10)
+        self.assertEqual(len(response.context['cards']), 10)
+
+        questions = dict(Card.objects.filter(pk__in=card_ids).values_list('pk', 'question__answer'))
+        # right for the first half, wrong for the rest
+        answers = {f'answer-{card_id}': questions[card_id] if number < 5 else '-1'
+                   for number, card_id in enumerate(card_ids)}
+        recorder = ProgressRecorder(flush_interval=None)
+        with mock.patch('FlashCardApp.progress.progress_recorder', recorder), \
+                mock.patch.object(recorder, 'record_many', wraps=recorder.record_many) as record_many:
+            response = self.client.post(reverse('FlashCardApp:quiz_result', args=[self.deck.pk]),
+                                        answers, HTTP_HX_REQUEST='true')
+        self.assertContains(response, 'Score: 5 / 10')
+        self.assertEqual(record_many.call_count, 1)
+        recorder.flush()
+        self.assertEqual(UserProgress.objects.filter(user=self.user, correct_attempts=1).count(), 5)
+        self.assertEqual(UserProgress.objects.filter(user=self.user).count(), 10)
+        self.assertNotIn(str(self.deck.pk), self.client.session[QUIZ_SESSION_KEY])
+
+    def test_result_must_be_posted(self):
+        response = self.client.get(reverse('FlashCardApp:quiz_result', args=[self.deck.pk]),
+                                   HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 405)
+
+    def test_result_without_a_quiz_is_not_found(self):
+        response = self.client.post(reverse('FlashCardApp:quiz_result', args=[self.deck.pk]),
+                                    {}, HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 404)
+
+
+class SchedulerTests(TestCase):
+    """
+    Test the SM-2 schedule and the due card queue
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='student', email='student@example.com', password='password123')
+        cls.deck = Deck.objects.create(name='Deck', author=cls.user, description='A deck')
+        questions = Question.objects.bulk_create([
+            Question(type=Question.QuestionType.TRUE_FALSE, question=f'Q{number}', answer='True')
+            for number in range(5)
+        ])
+        cls.cards = Card.objects.bulk_create([Card(deck=cls.deck, question=question)
+                                              for question in questions])
+
+    def test_review_follows_sm2(self):
+        progress = UserProgress()
+        now = timezone.now()
+        intervals = []
+        for _ in range(3):
+            review(progress, True, now)
+            intervals.append(progress.interval_days)
+        self.assertEqual(intervals, [1, 6, round(6 * progress.ease_factor)])
+        ease = progress.ease_factor
+        review(progress, False, now)
+        self.assertEqual((progress.repetitions, progress.interval_days), (0, 1))
+        self.assertLess(progress.ease_factor, ease)
+        self.assertEqual(progress.next_due_at, now + timedelta(days=1))
+
+    def test_ease_has_a_floor(self):
+        progress = UserProgress()
+        for _ in range(20):
+            review(progress, False)
+        self.assertEqual(progress.ease_factor, 1.3)
+
+    def test_enrolled_cards_are_due_in_one_query(self):
+        self.assertEqual(enroll(self.user.pk, self.deck.pk), 5)
+        self.assertEqual(enroll(self.user.pk, self.deck.pk), 0)
+        with self.assertNumQueries(1):
+            cards = next_due_cards(self.user.pk, self.deck.pk, 3)
+            questions = [card.question.question for card in cards]
+        self.assertEqual(len(questions), 3)
+
+    def test_answered_cards_leave_the_queue(self):
+        enroll(self.user.pk, self.deck.pk)
+        recorder = ProgressRecorder(flush_interval=None)
+        for card in self.cards[:2]:
+            recorder.record(self.user.pk, card.pk, True)
+        recorder.flush()
+        due = next_due_cards(self.user.pk, self.deck.pk, 10)
+        self.assertEqual({card.pk for card in due}, {card.pk for card in self.cards[2:]})
+        tomorrow = timezone.now() + timedelta(days=1, minutes=1)
+        self.assertEqual(len(next_due_cards(self.user.pk, self.deck.pk, 10, now=tomorrow)), 5)
+
+    def test_recorded_rows_know_their_deck(self):
+        recorder = ProgressRecorder(flush_interval=None)
+        recorder.record(self.user.pk, self.cards[0].pk, False)
+        recorder.flush()
+        progress = UserProgress.objects.get()
+        self.assertEqual(progress.deck_id, self.deck.pk)
+        self.assertEqual(progress.repetitions, 0)
+        self.assertGreater(progress.next_due_at, timezone.now())
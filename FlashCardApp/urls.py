@@ -7,14 +7,22 @@ urlpatterns = [
     path("decks/", views.FlashCardAppView.deck_list, name="deck_list"),
     path("decks/<int:deck_id>/",
          views.FlashCardAppView.deck_detail, name="deck_detail"),
+    path("decks/<int:deck_id>/quiz/",
+         views.FlashCardAppView.quiz, name="quiz"),
+    path("decks/<int:deck_id>/quiz/result/",
+         views.FlashCardAppView.quiz_result, name="quiz_result"),
 ]
 
 # Smaller URLS for each view
+# (the sections swap their options menu in out of band, these stay for direct loads)
 url_bits = [
     path("decks/<int:deck_id>/options/",
          views.FlashCardAppView.deck_detail_options, name="deck_options"),
     path("decks/options/",
          views.FlashCardAppView.deck_list_options, name="deck_list_options"),
+    path("decks/<int:deck_id>/cards/<int:card_id>/answer/",
+         views.FlashCardAppView.card_answer_result, name="deck_card_answer_result"),
+    # without the deck, kept for forms rendered before it was added
     path("card/<int:card_id>/answer/",
          views.FlashCardAppView.card_answer_result, name="card_answer_result"),
 ]
@@ -1,7 +1,40 @@
+import json
+
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404
+from django.views.decorators.http import require_http_methods
+from BaseApp.pagination import InvalidCursorError, KeysetPaginator
 from BaseApp.views import BasePage
-from BaseApp.utils import require_htmx
+from BaseApp.utils import get_module_logger, require_htmx
+from .grading import answer_keys, grade, grade_batch
 from .models import Deck, Card
+from .progress import record_attempt, record_attempts
+from .quiz import pop_quiz, start_quiz
+
+module_logger = get_module_logger("views", __file__)
+
+DECK_LIST_PAGE_SIZE = 24
+# newest first, covered by the deck_*_created indexes
+DECK_ORDERING = ('-created_at', '-id')
+
+
+def get_deck_page(cursor=None, page_size=DECK_LIST_PAGE_SIZE, subject_id=None, author_id=None):
+    """
+    Returns a KeysetPage of decks with their subject and card_count, in one query.
+    The card count is a subquery evaluated for the decks of the page only.
+    Raises InvalidCursorError for cursors that were not issued by this function.
+    """
+    decks = Deck.objects.select_related('subject').annotate(card_count=Coalesce(Subquery(
+        Card.objects.filter(deck=OuterRef('pk')).order_by().values('deck')
+        .annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField()), 0))
+    if subject_id is not None:
+        decks = decks.filter(subject_id=subject_id)
+    if author_id is not None:
+        decks = decks.filter(author_id=author_id)
+    return KeysetPaginator(decks, DECK_ORDERING, page_size).get_page(cursor)
 
 
 class FlashCardAppView(BasePage):
@@ -13,10 +46,27 @@ class FlashCardAppView(BasePage):
     @staticmethod
     @require_htmx
     def deck_list(request):
+        """
+        The first page of the deck list, or with a cursor the page that follows
+        (appended by the infinite scroll). Filters: subject and author ids.
+        """
+        try:
+            filters = {name: int(request.GET[name]) for name in ('subject', 'author')
+                       if request.GET.get(name)}
+            cursor = request.GET.get('cursor') or None
+            page = get_deck_page(cursor, subject_id=filters.get('subject'),
+                                 author_id=filters.get('author'))
+        except (InvalidCursorError, ValueError) as e:
+            module_logger.warning(e)
+            return HttpResponseBadRequest('Invalid deck list parameters')
         context = {
-            'decks': Deck.objects.all(),
+            'decks': page,
+            'has_next': page.has_next,
+            'next_page_vals': json.dumps({**filters, 'cursor': page.next_cursor}),
             'title': 'Deck List'  # Add a title for this view
         }
+        if cursor:
+            return render(request, 'FlashCardApp/sections/parts/deck_list_page.html', context)
         return render(request, 'FlashCardApp/sections/deck_list.html', context)
 
     @staticmethod
@@ -28,7 +78,11 @@ class FlashCardAppView(BasePage):
     @staticmethod
     @require_htmx
     def deck_detail(request, deck_id):
-        deck = get_object_or_404(Deck, pk=deck_id)
+        # ONE QUERY FOR THE DECK, ONE FOR ALL CARDS WITH THEIR QUESTIONS
+        deck = get_object_or_404(
+            Deck.objects.prefetch_related(Prefetch(
+                'cards', queryset=Card.objects.select_related('question').order_by('id'))),
+            pk=deck_id)
         context = {
             'deck': deck,
             'title': f'Deck: {deck.name}'  # Dynamic title for each deck
@@ -46,45 +100,82 @@ class FlashCardAppView(BasePage):
 
     @staticmethod
     @require_htmx
-    def card_answer_result(request, card_id):
+    def card_answer_result(request, card_id, deck_id=None):
         if request.method == 'POST':
-            card = get_object_or_404(Card, pk=card_id)
+            if deck_id is None:
+                # OLD URL WITHOUT THE DECK, ONE QUERY TO FIND IT
+                deck_id = get_object_or_404(Card.objects.only('deck_id'), pk=card_id).deck_id
+            # GRADED FROM THE DECK'S ANSWER KEY, KEPT IN MEMORY WHILE THE DECK IS UNCHANGED
+            key = answer_keys.lookup(deck_id, card_id)
+            if key is None:
+                raise Http404("No card with a question in this deck.")
             user_answer = request.POST.get('answer')
-            correct_answer = card.question.answer
 
             context = {
-                'card': card,
+                'card_id': card_id,
                 'user_answer': user_answer,
-                'correct_answer': correct_answer,
+                'correct_answer': key.answer,
             }
 
             if not user_answer:
                 context['result'] = 'Please enter an answer!'
                 return render(request, 'FlashCardApp/sections/parts/card_answer_result.html', context)
 
-            if card.question.type == "NUMERIC":
-                try:
-                    user_answer = float(user_answer)
-                    correct_answer = float(correct_answer)
-                    tolerance = 0.01  # Allow for small floating-point discrepancies
-                    if abs(user_answer - correct_answer) < tolerance:
-                        context['result'] = 'Correct!'
-                    else:
-                        context['result'] = f'Incorrect. The correct answer is {correct_answer}.'
-                except ValueError:
-                    context['result'] = 'Invalid input. Please enter a number.'
-
-            elif card.question.type == "FREE_TEXT":
-                # Case-insensitive comparison
-                if user_answer.lower().strip() == correct_answer.lower().strip():
-                    context['result'] = 'Correct!'
-                else:
-                    context['result'] = f'Incorrect. The correct answer is "{correct_answer}".'
-
-            else:  # TRUE_FALSE or other types
-                if user_answer == correct_answer:
-                    context['result'] = 'Correct!'
-                else:
-                    context['result'] = f'Incorrect. The correct answer is {correct_answer}.'
+            correct, context['result'] = grade(key, user_answer)
+
+            # BUFFERED, WRITTEN TO UserProgress IN BATCHES
+            if correct is not None and request.user.is_authenticated:
+                record_attempt(request.user.pk, card_id, correct)
 
             return render(request, 'FlashCardApp/sections/parts/card_answer_result.html', context)
+
+    @staticmethod
+    @require_htmx
+    def quiz(request, deck_id):
+        deck = get_object_or_404(Deck.objects.only('name'), pk=deck_id)
+        card_ids = start_quiz(request.session, deck.pk, answer_keys.get(deck.pk))
+        # ONE QUERY FOR THE WHOLE BATCH, IN THE SHUFFLED ORDER
+        cards = Card.objects.select_related('question').in_bulk(card_ids)
+        context = {
+            'deck': deck,
+            'cards': [cards[card_id] for card_id in card_ids if card_id in cards],
+            'title': f'Quiz: {deck.name}'
+        }
+        return render(request, 'FlashCardApp/sections/quiz.html', context)
+
+    @staticmethod
+    @require_http_methods(['POST'])
+    @require_htmx
+    def quiz_result(request, deck_id):
+        card_ids = pop_quiz(request.session, deck_id)
+        if card_ids is None:
+            raise Http404("No quiz in progress for this deck.")
+        # GRADED TOGETHER FROM THE DECK'S ANSWER KEY, CARDS DELETED MEANWHILE ARE LEFT OUT
+        keys = answer_keys.get(deck_id)
+        card_ids = [card_id for card_id in card_ids if card_id in keys]
+        user_answers = [request.POST.get(f'answer-{card_id}', '') for card_id in card_ids]
+        graded = grade_batch([keys[card_id] for card_id in card_ids], user_answers)
+
+        outcomes = {card_id: correct for card_id, (correct, _) in zip(card_ids, graded)
+                    if correct is not None}
+        if outcomes and request.user.is_authenticated:
+            record_attempts(request.user.pk, outcomes)
+
+        cards = Card.objects.select_related('question').in_bulk(card_ids)
+        context = {
+            'deck_id': deck_id,
+            'results': [
+                {
+                    'card': cards[card_id],
+                    'user_answer': user_answer,
+                    'correct_answer': keys[card_id].answer,
+                    'correct': correct,
+                    'result': result,
+                }
+                for card_id, user_answer, (correct, result) in zip(card_ids, user_answers, graded)
+                if card_id in cards
+            ],
+            'score': sum(outcomes.values()),
+            'total': len(card_ids),
+        }
+        return render(request, 'FlashCardApp/sections/quiz_result.html', context)
@@ -60,7 +60,7 @@ def create_user_profile(sender, instance, created, **kwargs):
             group, _ = Group.objects.get_or_create(
                 name='Basic User')  # Corrected
             instance.groups.add(group)
-            module_logger.debug(f"Creating Profile for {instance}")
+            module_logger.debug("Creating Profile for {}", instance)
             Profile.objects.get_or_create(user=instance)
     except Exception as e:
         module_logger.error(f"Error creating Profile: {e}")
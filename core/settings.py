@@ -28,6 +28,16 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Minimum level of the module loggers (BaseApp.utils.get_module_logger),
+# records below it are dropped before their message is formatted.
+LOG_LEVEL = "DEBUG" if DEBUG else "INFO"
+# Per module overrides, e.g. {"menu_tags": "INFO"}
+LOG_LEVELS = {}
+
+# Fraction of requests RequestTimingMiddleware times (Server-Timing header
+# and a log record in BaseApp/logs/middleware.log), 0 turns it off.
+REQUEST_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -61,6 +71,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "BaseApp.middleware.StaticFilesMiddleware",
+    "BaseApp.middleware.RequestTimingMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,13 +83,15 @@ MIDDLEWARE = [
     "django_browser_reload.middleware.BrowserReloadMiddleware",
     "allauth.account.middleware.AccountMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "BaseApp.middleware.InitializerMiddleware",
 ]
 
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # the Django backend, timing renders for RequestTimingMiddleware
+        'BACKEND': 'BaseApp.timing.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -137,6 +151,23 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Static path of the bundle written by manage.py bundle_modules, e.g. 'BaseApp/bundle.mjs'.
+# When set every ES module is imported from it instead (see BaseApp.modules)
+MODULE_BUNDLE = None
+
+# In production collectstatic writes hashed and precompressed files, which
+# BaseApp.middleware.StaticFilesMiddleware serves (see BaseApp.storage)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": ("django.contrib.staticfiles.storage.StaticFilesStorage" if DEBUG
+                    else "BaseApp.storage.CompressedManifestStaticFilesStorage"),
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -145,6 +176,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TAILWIND_APP_NAME = 'theme'
 
+# Buffer card answers and write them to UserProgress in batches (see FlashCardApp.progress)
+PROGRESS_WRITE_BEHIND = True
+
 AUTH_USER_MODEL = 'UsersApp.User'
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_EMAIL_VERIFICATION = "optional"
@@ -69,3 +69,16 @@ class BlogUser(HttpUser):
             if response.status_code != 200:
                 print(
                     f"Failed POST /blog/blog-post-list/: {response.status_code} - {response.text}")
+
+    @task(4)
+    def cached_blog_posts(self):
+        # GET listing, revalidated with the ETag of the previous response
+        headers = {}
+        if getattr(self, 'blog_posts_etag', None):
+            headers["If-None-Match"] = self.blog_posts_etag
+        response = self.client.get("/blog/posts/", headers=headers)
+        if response.status_code not in (200, 304):
+            print(
+                f"Failed GET /blog/posts/: {response.status_code} - {response.text}")
+        elif response.status_code == 200:
+            self.blog_posts_etag = response.headers.get("ETag")